@@ -26,6 +26,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds to wait on connect/read before giving up on an HTTP call
+REQUEST_TIMEOUT = 10
+
 
 class TelegramAPI:
     """
@@ -60,7 +63,7 @@ class TelegramAPI:
             bool: True if token is valid, False otherwise
         """
         try:
-            response = self.session.get(f"{self.api_url}/getMe")
+            response = self.session.get(f"{self.api_url}/getMe", timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -96,7 +99,8 @@ class TelegramAPI:
             params["offset"] = offset
         
         try:
-            response = self.session.get(f"{self.api_url}/getUpdates", params=params)
+            response = self.session.get(f"{self.api_url}/getUpdates", params=params,
+                                        timeout=timeout + REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -148,7 +152,7 @@ class TelegramAPI:
             params["reply_markup"] = json.dumps(reply_markup)
         
         try:
-            response = self.session.post(f"{self.api_url}/sendMessage", json=params)
+            response = self.session.post(f"{self.api_url}/sendMessage", json=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -203,17 +207,17 @@ class TelegramAPI:
             if isinstance(photo, str) and (photo.startswith("http") or photo.startswith("file://")):
                 # Photo is a URL
                 params["photo"] = photo
-                response = self.session.post(f"{self.api_url}/sendPhoto", json=params)
+                response = self.session.post(f"{self.api_url}/sendPhoto", json=params, timeout=REQUEST_TIMEOUT)
             elif isinstance(photo, str) and len(photo) < 100:
                 # Photo is likely a file_id
                 params["photo"] = photo
-                response = self.session.post(f"{self.api_url}/sendPhoto", json=params)
+                response = self.session.post(f"{self.api_url}/sendPhoto", json=params, timeout=REQUEST_TIMEOUT)
             else:
                 # Photo is a file or file content
                 files = {
                     "photo": photo if isinstance(photo, bytes) else open(photo, "rb"),
                 }
-                response = self.session.post(f"{self.api_url}/sendPhoto", data=params, files=files)
+                response = self.session.post(f"{self.api_url}/sendPhoto", data=params, files=files, timeout=REQUEST_TIMEOUT)
             
             response.raise_for_status()
             data = response.json()
@@ -269,17 +273,17 @@ class TelegramAPI:
             if isinstance(document, str) and (document.startswith("http") or document.startswith("file://")):
                 # Document is a URL
                 params["document"] = document
-                response = self.session.post(f"{self.api_url}/sendDocument", json=params)
+                response = self.session.post(f"{self.api_url}/sendDocument", json=params, timeout=REQUEST_TIMEOUT)
             elif isinstance(document, str) and len(document) < 100:
                 # Document is likely a file_id
                 params["document"] = document
-                response = self.session.post(f"{self.api_url}/sendDocument", json=params)
+                response = self.session.post(f"{self.api_url}/sendDocument", json=params, timeout=REQUEST_TIMEOUT)
             else:
                 # Document is a file or file content
                 files = {
                     "document": document if isinstance(document, bytes) else open(document, "rb"),
                 }
-                response = self.session.post(f"{self.api_url}/sendDocument", data=params, files=files)
+                response = self.session.post(f"{self.api_url}/sendDocument", data=params, files=files, timeout=REQUEST_TIMEOUT)
             
             response.raise_for_status()
             data = response.json()
@@ -308,7 +312,7 @@ class TelegramAPI:
         }
         
         try:
-            response = self.session.get(f"{self.api_url}/getFile", params=params)
+            response = self.session.get(f"{self.api_url}/getFile", params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -333,7 +337,7 @@ class TelegramAPI:
             File content as bytes if destination is None, otherwise None
         """
         try:
-            response = self.session.get(f"{self.file_url}/{file_path}")
+            response = self.session.get(f"{self.file_url}/{file_path}", timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             if destination:
@@ -375,9 +379,9 @@ class TelegramAPI:
         
         try:
             if files:
-                response = self.session.post(f"{self.api_url}/setWebhook", data=params, files=files)
+                response = self.session.post(f"{self.api_url}/setWebhook", data=params, files=files, timeout=REQUEST_TIMEOUT)
             else:
-                response = self.session.post(f"{self.api_url}/setWebhook", json=params)
+                response = self.session.post(f"{self.api_url}/setWebhook", json=params, timeout=REQUEST_TIMEOUT)
             
             response.raise_for_status()
             data = response.json()
@@ -400,7 +404,7 @@ class TelegramAPI:
             True if webhook was deleted successfully, False otherwise
         """
         try:
-            response = self.session.get(f"{self.api_url}/deleteWebhook")
+            response = self.session.get(f"{self.api_url}/deleteWebhook", timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -422,7 +426,7 @@ class TelegramAPI:
             WebhookInfo object
         """
         try:
-            response = self.session.get(f"{self.api_url}/getWebhookInfo")
+            response = self.session.get(f"{self.api_url}/getWebhookInfo", timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -694,7 +698,7 @@ class ExternalServiceAPI:
         }
         
         try:
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -732,7 +736,7 @@ class ExternalServiceAPI:
             params["category"] = category
         
         try:
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -768,7 +772,7 @@ class ExternalServiceAPI:
             params["source"] = source_language
         
         try:
-            response = self.session.post(url, params=params)
+            response = self.session.post(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -808,7 +812,7 @@ class ExternalServiceAPI:
         }
         
         try:
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
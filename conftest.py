@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pytest configuration for the Telegram Bot test suite.
+
+Its presence marks the project root: pytest puts this directory on sys.path,
+so the tests import the bot modules (deploy, monitor, api, ...) directly.
+"""
+
+import logging
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _quiet_logging():
+    """Raise the root log level so routine INFO records are dropped unformatted."""
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    yield
+    root.setLevel(level)
@@ -18,6 +18,7 @@ import time
 import shutil
 import subprocess
 import argparse
+import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union, Any, Callable
 
@@ -388,7 +389,13 @@ class Deployment:
         
         # Validate source directory
         required_files = ["enhanced_bot.py", "api.py", "integration.py", "monitor.py"]
-        missing_files = [file for file in required_files if not os.path.exists(os.path.join(source_dir, file))]
+        try:
+            with os.scandir(source_dir) as entries:
+                present = {entry.name for entry in entries}
+        except OSError:
+            # A missing or unreadable source directory has none of the files
+            present = set()
+        missing_files = [file for file in required_files if file not in present]
         
         if missing_files:
             return {
@@ -427,6 +434,13 @@ class Deployment:
         deploy_dir = options.get("deploy_dir")
         backup = options.get("backup", True)
         restart = options.get("restart", True)
+        copy_method = options.get("copy_method", "copy")
+        
+        if copy_method not in ("auto", "link", "copy"):
+            return {
+                "status": "error",
+                "error": f"Unknown copy method: {copy_method}",
+            }
         
         # Copy files to deployment directory if specified
         if deploy_dir:
@@ -444,9 +458,12 @@ class Deployment:
                 if os.path.isdir(source_item):
                     if os.path.exists(dest_item):
                         shutil.rmtree(dest_item)
-                    shutil.copytree(source_item, dest_item)
+                    shutil.copytree(
+                        source_item, dest_item,
+                        copy_function=lambda src, dst: self._copy_file(src, dst, copy_method),
+                    )
                 else:
-                    shutil.copy2(source_item, dest_item)
+                    self._copy_file(source_item, dest_item, copy_method)
             
             logger.info(f"Copied files to {deploy_dir}")
         
@@ -454,9 +471,12 @@ class Deployment:
         env_vars = env_config.get("env_vars", {})
         env_file_path = os.path.join(deploy_dir or source_dir, ".env")
         
+        # A deployed .env may be a hard link to the source copy; never write through it
+        if deploy_dir and os.path.lexists(env_file_path):
+            os.remove(env_file_path)
+        
         with open(env_file_path, "w") as f:
-            for key, value in env_vars.items():
-                f.write(f"{key}={value}\n")
+            f.write("".join(f"{key}={value}\n" for key, value in env_vars.items()))
         
         logger.info(f"Created environment file at {env_file_path}")
         
@@ -469,6 +489,37 @@ class Deployment:
             "message": "Deployment execution completed",
         }
     
+    def _copy_file(self, source: str, dest: str, copy_method: str = "copy") -> None:
+        """
+        Place a single file in the deployment directory.
+        
+        "copy" (the default) always copies, so the deployment is independent of
+        the source tree. With "link" or "auto" the file is hard-linked instead,
+        which avoids copying its data when both directories are on the same
+        filesystem, but editing or checking out files in the source tree then
+        changes the live deployment in place. Only opt in when the source is an
+        immutable artifact. "auto" falls back to a full copy when linking fails
+        (e.g. across devices).
+        
+        Args:
+            source: Source file path
+            dest: Destination file path
+            copy_method: One of "auto", "link" or "copy"
+        """
+        # Replace rather than overwrite, in case dest is a link from an earlier deployment
+        if os.path.lexists(dest):
+            os.remove(dest)
+        
+        if copy_method != "copy":
+            try:
+                os.link(source, dest)
+                return
+            except OSError:
+                if copy_method == "link":
+                    raise
+        
+        shutil.copy2(source, dest)
+    
     def _restart_service(self, env_name: str, deploy_dir: str, options: Dict) -> Dict:
         """
         Restart the bot service.
@@ -528,7 +579,8 @@ class Deployment:
         # Get environment configuration
         env_config = self.environments[env_name]
         
-        # Get verification options
+        # Get verification options; the webhook is requested once without retries,
+        # so verify_timeout bounds each connect and read wait
         verify_timeout = options.get("verify_timeout", 30)
         
         # Check if webhook URL is specified
@@ -775,8 +827,10 @@ def main():
     parser.add_argument("--env", help="Environment to deploy to")
     parser.add_argument("--source", help="Source directory containing the bot code")
     parser.add_argument("--deploy-dir", help="Deployment directory")
-    parser.add_argument("--backup", action="store_true", help="Create backup before deployment")
-    parser.add_argument("--no-restart", action="store_true", help="Skip service restart")
+    parser.add_argument("--backup", action=argparse.BooleanOptionalAction, default=False,
+                        help="Create backup before deployment")
+    parser.add_argument("--restart", action=argparse.BooleanOptionalAction, default=True,
+                        help="Restart the service after deployment")
     parser.add_argument("--rollback", help="Rollback to a specific deployment ID")
     parser.add_argument("--list", action="store_true", help="List deployment history")
     parser.add_argument("--list-env", action="store_true", help="List available environments")
@@ -826,7 +880,7 @@ def main():
     options = {
         "deploy_dir": args.deploy_dir,
         "backup": args.backup,
-        "restart": not args.no_restart,
+        "restart": args.restart,
     }
     
     result = deployment.deploy(env_name=env_name, source_dir=source_dir, options=options)
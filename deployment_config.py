@@ -400,7 +400,7 @@ class DeploymentConfig:
         logger.info(f"Updated environment variables for {env_name}")
         return True
     
-    def generate_env_file(self, env_name: str, output_file: str) -> bool:
+    def generate_env_file(self, env_name: str, output_file: str) -> Optional[str]:
         """
         Generate a .env file for a specific environment.
         
@@ -409,23 +409,24 @@ class DeploymentConfig:
             output_file: Path to output .env file
             
         Returns:
-            True if .env file was generated successfully, False otherwise
+            The generated file content ("" if there are no variables), or None if the file could not be written
         """
         env_vars = self.get_environment_variables(env_name)
         
         if not env_vars:
             logger.warning(f"No environment variables found for {env_name}")
         
+        content = "".join(f"{key}={value}\n" for key, value in env_vars.items())
+        
         try:
             with open(output_file, 'w') as f:
-                for key, value in env_vars.items():
-                    f.write(f"{key}={value}\n")
+                f.write(content)
             
             logger.info(f"Generated .env file for {env_name} at {output_file}")
-            return True
+            return content
         except Exception as e:
             logger.error(f"Error generating .env file: {e}")
-            return False
+            return None
     
     def generate_render_yaml(self, output_file: str) -> bool:
         """
@@ -465,7 +466,7 @@ class DeploymentConfig:
             
             # Write to file
             with open(output_file, 'w') as f:
-                yaml.dump(content, f, default_flow_style=False)
+                f.write(yaml.dump(content, default_flow_style=False))
             
             logger.info(f"Generated render.yaml file at {output_file}")
             return True
@@ -564,7 +565,7 @@ def main():
         env_name = args.env or config_manager.get_default_environment()
         result = config_manager.generate_env_file(env_name, args.env_file)
         
-        if result:
+        if result is not None:
             print(f"Generated .env file for {env_name} at {args.env_file}")
         else:
             print(f"Failed to generate .env file for {env_name}")
@@ -15,13 +15,18 @@ import sys
 import logging
 import json
 import time
+import socket
 import requests
 import smtplib
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any, Callable
+from typing import Dict, List, Optional, Union, Any, Callable, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
 # Import the Bot class from telegram for type hinting and sending messages
 from telegram import Bot as TelegramBotInstance # Renamed to avoid conflict if Bot is used elsewhere
@@ -33,6 +38,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds a resolved service address is reused before DNS is queried again
+DNS_CACHE_TTL = 300
+
+# Default HTTP timeouts in seconds; unreachable hosts fail on the shorter connect timeout
+DEFAULT_CONNECT_TIMEOUT = 3
+DEFAULT_READ_TIMEOUT = 7
+
+# Maximum number of service checks run at the same time by check_all_services()
+MAX_CHECK_WORKERS = 8
+
+# Hostname -> (addresses in the order they are tried, expiry on the time.monotonic() clock)
+_dns_cache: Dict[str, Tuple[List[str], float]] = {}
+
+# Disable Nagle's algorithm for small requests and probe idle pooled
+# connections so dropped ones are noticed before the next check times out
+SERVICE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+for _option, _value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 30), ("TCP_KEEPCNT", 3)):
+    if hasattr(socket, _option):  # Not available on every platform
+        SERVICE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _option), _value))
+
+
+def resolve_host(host: str) -> List[str]:
+    """
+    Resolve a hostname to all of its addresses, reusing the cached list while it is still fresh.
+    
+    Args:
+        host: Hostname to resolve
+        
+    Returns:
+        Resolved IP addresses in the order they should be tried, or [host] if resolution failed
+    """
+    cached = _dns_cache.get(host)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror:
+        # Let the connection perform its own lookup and report the error
+        return [host]
+    
+    addresses = []
+    for info in infos:
+        if info[4][0] not in addresses:
+            addresses.append(info[4][0])
+    return addresses
+
+
+class _CachedDNSConnectionMixin:
+    """Open sockets against the cached addresses while keeping the hostname for TLS."""
+    
+    def _new_conn(self):
+        hostname = self._dns_host
+        addresses = resolve_host(hostname)
+        error = None
+        try:
+            # Try every address in turn, like urllib3's create_connection does
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    conn = super()._new_conn()
+                except Exception as e:
+                    error = e
+                    continue
+                if address != hostname:
+                    # Only cache addresses that connected, trying the working one first;
+                    # a fresh entry keeps its expiry so it is still re-resolved on time
+                    cached = _dns_cache.get(hostname)
+                    expiry = cached[1] if cached and cached[0] is addresses else time.monotonic() + DNS_CACHE_TTL
+                    _dns_cache[hostname] = ([address] + [a for a in addresses if a != address], expiry)
+                return conn
+        finally:
+            self._dns_host = hostname
+        
+        # None of the addresses accepted the connection; resolve again on the next attempt
+        _dns_cache.pop(hostname, None)
+        raise error
+
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class ServiceHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter for service sessions.
+    
+    New connections resolve their hostname through the module-level DNS cache
+    instead of calling getaddrinfo for every socket that is opened, and are
+    created with SERVICE_SOCKET_OPTIONS applied.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", SERVICE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
 
 class ServiceIntegration:
     """
@@ -53,6 +172,18 @@ class ServiceIntegration:
         self.services = {}
         self.session = requests.Session()
         
+        # Reuse resolved addresses across health checks and service calls
+        adapter = ServiceHTTPAdapter()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Health check handlers keyed by service type
+        self._checkers = {
+            "http": self._check_http_service,
+            "smtp": self._check_smtp_service,
+            "database": self._check_database_service,
+        }
+        
         # Load configuration if provided
         if config_file and os.path.exists(config_file):
             self.load_config(config_file)
@@ -177,24 +308,55 @@ class ServiceIntegration:
         service_config = service.get("config", {})
         service["last_check"] = datetime.now().isoformat()
         service_type = service_config.get("type", "")
-        if service_type == "http":
-            return self._check_http_service(service_name, service_config)
-        elif service_type == "smtp":
-            return self._check_smtp_service(service_name, service_config)
-        elif service_type == "database":
-            return self._check_database_service(service_name, service_config)
-        else:
+        checker = self._checkers.get(service_type)
+        if checker is None:
             service["status"] = "unknown"
             return {
                 "status": "unknown",
                 "error": f"Unknown service type: {service_type}",
             }
+        return checker(service_name, service_config)
+
+    def check_all_services(self) -> Dict[str, Dict]:
+        """
+        Check every enabled service.
+        
+        The checks are independent network probes, so they run concurrently and
+        take about as long as the slowest one.
+        
+        Returns:
+            Check results keyed by service name
+        """
+        service_names = list(self.services)
+        if len(service_names) <= 1:
+            return {service_name: self.check_service(service_name) for service_name in service_names}
+        
+        with ThreadPoolExecutor(max_workers=min(len(service_names), MAX_CHECK_WORKERS)) as executor:
+            futures = {service_name: executor.submit(self.check_service, service_name) for service_name in service_names}
+        return {service_name: future.result() for service_name, future in futures.items()}
+
+    def _get_http_timeout(self, service_config: Dict) -> Union[float, Tuple[float, float]]:
+        """
+        Get the request timeout for an HTTP service.
+        
+        Args:
+            service_config: Service configuration
+            
+        Returns:
+            The configured "timeout" if set, otherwise a (connect, read) timeout tuple
+        """
+        if "timeout" in service_config:
+            return service_config["timeout"]
+        return (
+            service_config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+            service_config.get("read_timeout", DEFAULT_READ_TIMEOUT),
+        )
 
     def _check_http_service(self, service_name: str, service_config: Dict) -> Dict:
         url = service_config.get("url", "")
         method = service_config.get("method", "GET")
         headers = service_config.get("headers", {})
-        timeout = service_config.get("timeout", 10)
+        timeout = self._get_http_timeout(service_config)
         if not url:
             self.services[service_name]["status"] = "error"
             return {
@@ -229,7 +391,7 @@ class ServiceIntegration:
             self.services[service_name]["status"] = "timeout"
             return {
                 "status": "timeout",
-                "error": f"Request timed out after {timeout} seconds",
+                "error": f"Request timed out (timeout: {timeout})",
             }
         except Exception as e:
             self.services[service_name]["status"] = "error"
@@ -334,7 +496,7 @@ class ServiceIntegration:
         params = kwargs.get("params", {})
         data = kwargs.get("data", None)
         json_data = kwargs.get("json", None)
-        timeout = kwargs.get("timeout", service_config.get("timeout", 10))
+        timeout = kwargs.get("timeout", self._get_http_timeout(service_config))
 
         if base_url and url and not url.startswith(("http://", "https://")):
             url = base_url.rstrip("/") + "/" + url.lstrip("/")
@@ -12,15 +12,35 @@ and user activity tracking.
 
 import os
 import sys
+import atexit
 import logging
 import json
 import time
+import functools
+import heapq
+import itertools
+import operator
+import weakref
 import psutil
+import queue
 import threading
 import socket
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any, Callable
-from collections import defaultdict, deque
+from typing import Dict, List, Optional, Union, Any, Callable, Tuple
+from collections import Counter, defaultdict, deque
+
+# Optional fast JSON serializer for log file entries
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    orjson = None
+    _json_encoder = json.JSONEncoder(separators=(",", ":"))
+    
+    def _dumps(obj: Any) -> bytes:
+        return _json_encoder.encode(obj).encode()
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +50,280 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class DuplicateLogFilter(logging.Filter):
+    """
+    Suppresses repeated warning and error messages.
+    
+    A WARNING or higher record is dropped if a record with the same level and
+    message passed the filter within the last `interval` seconds. This keeps
+    background loops that fail on every iteration from flooding the logs.
+    """
+    
+    def __init__(self, interval: float = 60.0, max_entries: int = 1000):
+        """
+        Initialize the filter.
+        
+        Args:
+            interval: Seconds during which an identical message is suppressed
+            max_entries: Number of tracked messages before expired ones are pruned
+        """
+        super().__init__()
+        self.interval = interval
+        self.max_entries = max_entries
+        self._last_emitted = {}
+        # Records arrive from the scheduler thread, executor workers and the main thread
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        
+        key = (record.levelno, record.getMessage())
+        with self._lock:
+            now = time.monotonic()
+            last_emitted = self._last_emitted.get(key)
+            if last_emitted is not None and now - last_emitted < self.interval:
+                return False
+            
+            if len(self._last_emitted) >= self.max_entries:
+                self._last_emitted = {
+                    k: t for k, t in self._last_emitted.items() if now - t < self.interval
+                }
+            self._last_emitted[key] = now
+            return True
+
+
+logger.addFilter(DuplicateLogFilter())
+
+# Maximum number of buffers passed to a single os.writev call
+try:
+    LOG_IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    LOG_IOV_MAX = 16
+if LOG_IOV_MAX <= 0:
+    # -1 means no limit; stay at the common Linux value
+    LOG_IOV_MAX = 1024
+
+# Seconds a system resource snapshot is reused before psutil is queried again
+SYSTEM_SNAPSHOT_TTL = 1.0
+
+# Seconds between CPU usage samples taken on the scheduler thread
+CPU_SAMPLE_INTERVAL = 1.0
+
+
+def _isoformat(timestamp: float) -> str:
+    """Format a time.time() timestamp as a local ISO 8601 string."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_uptime(total_seconds: int) -> str:
+    """
+    Format a duration in whole seconds as a human-readable string.
+    
+    Args:
+        total_seconds: Duration in seconds
+        
+    Returns:
+        Formatted string, e.g. "1d 2h 3m 4s"
+    """
+    if total_seconds < 60:
+        return f"{total_seconds}s"
+    
+    minutes, seconds = total_seconds // 60, total_seconds % 60
+    if minutes < 60:
+        return f"{minutes}m {seconds}s"
+    
+    hours, minutes = minutes // 60, minutes % 60
+    if hours < 24:
+        return f"{hours}h {minutes}m {seconds}s"
+    
+    days, hours = hours // 24, hours % 24
+    return f"{days}d {hours}h {minutes}m {seconds}s"
+
+
+class LogEntry:
+    """
+    In-memory log record.
+    
+    Uses __slots__ instead of a per-entry dictionary to keep the bounded
+    log buffer small.
+    """
+    
+    __slots__ = ("timestamp", "level", "message", "user_id", "extra")
+    
+    def __init__(self, timestamp: float, level: str, message: str, user_id: int = None, extra: Dict = None):
+        """
+        Initialize the log entry.
+        
+        Args:
+            timestamp: Time of the entry (as returned by time.time())
+            level: Log level (INFO, WARNING, ERROR, etc.)
+            message: Log message
+            user_id: User ID associated with the log (if applicable)
+            extra: Additional data to include in the log
+        """
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.user_id = user_id
+        self.extra = extra
+    
+    def to_dict(self) -> Dict:
+        """
+        Convert the entry to a dictionary with a readable timestamp.
+        
+        Returns:
+            Log entry dictionary; user_id and extra are included only if set
+        """
+        log_entry = {
+            "timestamp": _isoformat(self.timestamp),
+            "level": self.level,
+            "message": self.message,
+        }
+        
+        if self.user_id is not None:
+            log_entry["user_id"] = self.user_id
+        
+        if self.extra is not None:
+            log_entry["extra"] = self.extra
+        
+        return log_entry
+
+
+class _Scheduler:
+    """
+    Runs periodic callbacks on a single shared daemon thread.
+    
+    Jobs are kept in a heap ordered by their next run time. Bound methods are
+    held through weak references, so a job is dropped once its object is
+    garbage collected.
+    """
+    
+    def __init__(self):
+        """Initialize the scheduler; the thread starts with the first job."""
+        self._jobs = []  # Heap of (next_run, job_id, interval, callback_ref)
+        self._cancelled = set()
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def schedule(self, interval: float, callback: Callable, delay: float = 0.0) -> int:
+        """
+        Run a callback every `interval` seconds.
+        
+        Args:
+            interval: Seconds between runs
+            callback: Function or bound method to call
+            delay: Seconds before the first run
+            
+        Returns:
+            Job ID that can be passed to cancel()
+        """
+        if hasattr(callback, "__self__"):
+            callback_ref = weakref.WeakMethod(callback)
+        else:
+            callback_ref = lambda: callback
+        
+        job_id = next(self._job_ids)
+        with self._lock:
+            heapq.heappush(self._jobs, (time.monotonic() + delay, job_id, interval, callback_ref))
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="monitor-scheduler")
+                self._thread.daemon = True
+                self._thread.start()
+        self._wakeup.set()
+        return job_id
+    
+    def cancel(self, job_id: int):
+        """
+        Stop running a scheduled job.
+        
+        Args:
+            job_id: Job ID returned by schedule()
+        """
+        with self._lock:
+            self._cancelled.add(job_id)
+    
+    def shutdown(self, timeout: float = 1.0):
+        """
+        Stop the scheduler thread.
+        
+        Registered with atexit so the thread exits before interpreter teardown
+        rather than being frozen while it holds the scheduler lock.
+        
+        Args:
+            timeout: Seconds to wait for a running job to finish
+        """
+        self._stop.set()
+        self._wakeup.set()
+        
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+    
+    def _run(self):
+        """Dispatch due jobs until shutdown() is called."""
+        while not self._stop.is_set():
+            with self._lock:
+                timeout = self._jobs[0][0] - time.monotonic() if self._jobs else None
+            
+            if timeout is None or timeout > 0:
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+                continue
+            
+            with self._lock:
+                next_run, job_id, interval, callback_ref = heapq.heappop(self._jobs)
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                    continue
+            
+            callback = callback_ref()
+            if callback is None:
+                continue
+            
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in scheduled task {getattr(callback, '__qualname__', callback)}: {e}")
+            del callback
+            
+            with self._lock:
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                else:
+                    next_run = max(next_run + interval, time.monotonic())
+                    heapq.heappush(self._jobs, (next_run, job_id, interval, callback_ref))
+
+
+# Shared by all monitors and trackers in the process
+_scheduler = _Scheduler()
+atexit.register(_scheduler.shutdown)
+
+# psutil keeps cpu_percent(interval=None) state per thread, so CPU usage is only
+# sampled on the scheduler thread and every reader uses the last sampled value
+_cpu_percent = 0.0
+_cpu_job = None
+_cpu_job_lock = threading.Lock()
+
+
+def _sample_cpu():
+    """Sample CPU usage since the previous sample (run periodically by the scheduler)."""
+    global _cpu_percent
+    _cpu_percent = psutil.cpu_percent(interval=None)
+
+
+def _start_cpu_sampling():
+    """Schedule CPU sampling once per process; the first run primes the scheduler thread."""
+    global _cpu_job
+    with _cpu_job_lock:
+        if _cpu_job is None:
+            _cpu_job = _scheduler.schedule(CPU_SAMPLE_INTERVAL, _sample_cpu)
+
+
 class SystemMonitor:
     """
     Monitors system resources and bot status.
@@ -50,10 +344,21 @@ class SystemMonitor:
         self.log_file = log_file
         self.max_log_size = max_log_size
         self.logs = deque(maxlen=1000)  # Keep last 1000 logs in memory
-        self.user_activity = defaultdict(list)
+        self.user_activity = defaultdict(lambda: deque(maxlen=100))  # Keep last 100 activities per user
+        
+        # Activity aggregates maintained by log_activity so queries need not rescan user_activity
+        self.first_seen = {}
+        self.last_seen = {}
+        self.command_counts = Counter()
+        self.hour_counts = [0] * 24
+        
         self.error_count = 0
         self.warning_count = 0
         self.maintenance_mode = False
+        
+        # Guards user activity, activity aggregates and counters shared with request handlers
+        self._lock = threading.Lock()
+        
         self.system_settings = {
             "max_connections": 100,
             "timeout": 30,
@@ -61,43 +366,57 @@ class SystemMonitor:
             "maintenance_mode": False,
         }
         
-        # Start monitoring thread
-        self.monitoring_active = True
-        self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
-        self.monitoring_thread.daemon = True
-        self.monitoring_thread.start()
+        # Keep the log file open and track its size instead of stat-ing it per entry
+        self._log_fd = None
+        self._log_bytes = 0
+        self._log_q = None
+        self._flush_lock = threading.Lock()
+        if self.log_file:
+            # Entries are handed off to the scheduler thread, which is the only file writer
+            self._log_q = queue.SimpleQueue()
+            self._open_log_file()
+        
+        _start_cpu_sampling()
+        self._sys_snap = None  # (monotonic time, cpu percent, memory, disk)
+        
+        # Schedule periodic system stats and log flushes; the first stats job runs
+        # after the CPU sampler has run twice, so its sample covers a real interval
+        self._jobs = [_scheduler.schedule(60, self._log_system_stats, delay=1)]
+        if self._log_fd is not None:
+            self._jobs.append(_scheduler.schedule(1, self.flush_logs, delay=1))
         
         logger.info("System monitor initialized")
     
     def __del__(self):
         """Clean up resources when the object is destroyed."""
-        self.monitoring_active = False
-        if hasattr(self, 'monitoring_thread') and self.monitoring_thread.is_alive():
-            self.monitoring_thread.join(timeout=1.0)
+        for job_id in getattr(self, '_jobs', []):
+            _scheduler.cancel(job_id)
+        if getattr(self, '_log_q', None) is not None:
+            self.flush_logs()
+        self._close_log_file()
     
-    def _monitoring_loop(self):
-        """Background thread for continuous monitoring."""
-        while self.monitoring_active:
-            try:
-                # Log system stats every minute
-                self._log_system_stats()
-                
-                # Sleep for 60 seconds
-                for _ in range(60):
-                    if not self.monitoring_active:
-                        break
-                    time.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(60)  # Sleep and retry
+    def _get_system_snapshot(self) -> Tuple[float, Any, Any]:
+        """
+        Get current CPU, memory and disk usage.
+        
+        The snapshot is shared by all callers for SYSTEM_SNAPSHOT_TTL seconds,
+        so bursts of status requests only read /proc once.
+        
+        Returns:
+            Tuple of (cpu percent, virtual memory info, disk usage info)
+        """
+        snapshot = self._sys_snap
+        now = time.monotonic()
+        if snapshot is None or now - snapshot[0] >= SYSTEM_SNAPSHOT_TTL:
+            snapshot = (now, _cpu_percent, psutil.virtual_memory(), psutil.disk_usage('/'))
+            self._sys_snap = snapshot
+        return snapshot[1:]
     
     def _log_system_stats(self):
         """Log current system statistics."""
         try:
             # Get system stats
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            cpu_percent, memory, disk = self._get_system_snapshot()
             
             # Create stats log entry
             stats = {
@@ -111,8 +430,9 @@ class SystemMonitor:
                 "active_users_24h": len(self._get_active_users_in_period(hours=24)),
             }
             
-            # Log at debug level
-            logger.debug(f"System stats: {json.dumps(stats)}")
+            # Log at debug level; skip serializing when debug output is disabled
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"System stats: {json.dumps(stats)}")
             
             # Add to internal logs
             self._add_log("STATS", "System statistics collected", extra=stats)
@@ -129,49 +449,121 @@ class SystemMonitor:
             user_id: User ID associated with the log (if applicable)
             extra: Additional data to include in the log
         """
-        timestamp = datetime.now()
-        
-        # Create log entry
-        log_entry = {
-            "timestamp": timestamp.isoformat(),
-            "level": level,
-            "message": message,
-        }
-        
-        if user_id is not None:
-            log_entry["user_id"] = user_id
-        
-        if extra is not None:
-            log_entry["extra"] = extra
+        # Create log entry; the timestamp is formatted only when the entry is read or written out
+        log_entry = LogEntry(time.time(), level, message, user_id, extra)
         
         # Add to in-memory logs
         self.logs.append(log_entry)
         
-        # Write to log file if configured
-        if self.log_file:
+        # Queue for the log file if configured; entries are written out by flush_logs()
+        if self._log_q is not None:
+            self._log_q.put(log_entry)
+    
+    def _open_log_file(self):
+        """Open the log file for unbuffered appending."""
+        try:
+            self._log_fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._log_bytes = os.fstat(self._log_fd).st_size
+        except Exception as e:
+            self._log_fd = None
+            logger.error(f"Error opening log file: {e}")
+    
+    def _close_log_file(self):
+        """Close the log file."""
+        if getattr(self, '_log_fd', None) is None:
+            return
+        try:
+            os.close(self._log_fd)
+        except Exception as e:
+            logger.error(f"Error closing log file: {e}")
+        self._log_fd = None
+    
+    def flush_logs(self):
+        """Write queued log entries to the log file."""
+        if self._log_q is None:
+            return
+        
+        with self._flush_lock:
+            # Drain everything queued so far into a single batch
+            batch = []
+            while True:
+                try:
+                    log_entry = self._log_q.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    batch.append(_dumps(log_entry.to_dict()) + b'\n')
+                except (TypeError, ValueError) as e:
+                    # Skip the entry but keep the rest of the batch
+                    logger.error(f"Error serializing log entry: {e}")
+            
+            if not batch or self._log_fd is None:
+                return
+            
             try:
+                size = sum(map(len, batch))
+                self._write_log_batch(batch)
+                self._log_bytes += size
+                
                 # Check if log file needs rotation
-                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) > self.max_log_size:
+                if self._log_bytes > self.max_log_size:
                     self._rotate_log_file()
-                
-                # Append to log file
-                with open(self.log_file, 'a') as f:
-                    f.write(json.dumps(log_entry) + '\n')
             except Exception as e:
                 logger.error(f"Error writing to log file: {e}")
     
+    def _write_log_batch(self, batch: List[bytes]):
+        """
+        Write encoded log lines to the log file.
+        
+        Lines are gather-written with os.writev so the batch is not copied
+        into one buffer first. Short writes are resumed where they stopped.
+        
+        Args:
+            batch: Encoded log lines; modified in place on short writes
+            
+        Raises:
+            OSError: If a write makes no progress
+        """
+        if not hasattr(os, "writev"):
+            data = memoryview(b''.join(batch))
+            while data:
+                written = os.write(self._log_fd, data)
+                if not written:
+                    raise OSError("Log file write made no progress")
+                data = data[written:]
+            return
+        
+        index = 0
+        while index < len(batch):
+            written = os.writev(self._log_fd, batch[index:index + LOG_IOV_MAX])
+            if not written:
+                raise OSError("Log file write made no progress")
+            
+            # Skip fully written lines and trim a partially written one
+            while written and written >= len(batch[index]):
+                written -= len(batch[index])
+                index += 1
+            if written:
+                batch[index] = batch[index][written:]
+    
     def _rotate_log_file(self):
         """Rotate the log file when it gets too large."""
         try:
+            self._close_log_file()
+            
             # Rename current log file with timestamp
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
             backup_file = f"{self.log_file}.{timestamp}"
             
-            if os.path.exists(self.log_file):
-                os.rename(self.log_file, backup_file)
-                logger.info(f"Rotated log file to {backup_file}")
+            os.rename(self.log_file, backup_file)
+            logger.info(f"Rotated log file to {backup_file}")
+        except FileNotFoundError:
+            # Log file was removed externally; reopening below recreates it
+            pass
         except Exception as e:
             logger.error(f"Error rotating log file: {e}")
+        finally:
+            self._open_log_file()
     
     def log_activity(self, user_id: int, activity: str, is_admin: bool = False):
         """
@@ -182,18 +574,23 @@ class SystemMonitor:
             activity: Activity description
             is_admin: Whether the activity was performed by an admin
         """
-        timestamp = datetime.now()
-        
-        # Add to user activity tracking
-        self.user_activity[user_id].append({
-            "timestamp": timestamp.isoformat(),
-            "activity": activity,
-            "is_admin": is_admin,
-        })
-        
-        # Trim user activity list if it gets too long
-        if len(self.user_activity[user_id]) > 100:
-            self.user_activity[user_id] = self.user_activity[user_id][-100:]
+        timestamp = time.time()
+        hour = time.localtime(timestamp).tm_hour
+        
+        with self._lock:
+            # Add to user activity tracking
+            self.user_activity[user_id].append({
+                "timestamp": timestamp,
+                "activity": activity,
+                "is_admin": is_admin,
+            })
+            
+            # Update activity aggregates
+            self.first_seen.setdefault(user_id, timestamp)
+            self.last_seen[user_id] = timestamp
+            if activity.endswith("_command"):
+                self.command_counts[activity[:-len("_command")]] += 1
+            self.hour_counts[hour] += 1
         
         # Add to logs
         self._add_log(
@@ -212,7 +609,8 @@ class SystemMonitor:
             user_id: User ID associated with the error (if applicable)
             extra: Additional data to include in the log
         """
-        self.error_count += 1
+        with self._lock:
+            self.error_count += 1
         
         # Add to logs
         self._add_log(
@@ -231,7 +629,8 @@ class SystemMonitor:
             user_id: User ID associated with the warning (if applicable)
             extra: Additional data to include in the log
         """
-        self.warning_count += 1
+        with self._lock:
+            self.warning_count += 1
         
         # Add to logs
         self._add_log(
@@ -249,12 +648,10 @@ class SystemMonitor:
             System status information
         """
         uptime = datetime.now() - self.start_time
-        uptime_str = self._format_timedelta(uptime)
+        uptime_str = _format_uptime(int(uptime.total_seconds()))
         
         # Get current resource usage
-        cpu_percent = psutil.cpu_percent(interval=0.5)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        cpu_percent, memory, disk = self._get_system_snapshot()
         
         # Determine status based on resource usage
         if cpu_percent > 90 or memory.percent > 90 or disk.percent > 90:
@@ -298,29 +695,15 @@ class SystemMonitor:
         # Get new users in the last 7 days
         new_users_7d = self._get_new_users_in_period(days=7)
         
-        # Count total commands
-        total_commands = 0
-        command_counts = defaultdict(int)
-        
-        for user_id, activities in self.user_activity.items():
-            for activity in activities:
-                if activity["activity"].endswith("_command"):
-                    total_commands += 1
-                    command = activity["activity"].replace("_command", "")
-                    command_counts[command] += 1
-        
-        # Get most popular commands
-        popular_commands = sorted(command_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        popular_commands = [cmd for cmd, _ in popular_commands]
-        
-        # Determine peak usage time
-        hour_counts = defaultdict(int)
-        for user_id, activities in self.user_activity.items():
-            for activity in activities:
-                timestamp = datetime.fromisoformat(activity["timestamp"])
-                hour_counts[timestamp.hour] += 1
-        
-        peak_hour = max(hour_counts.items(), key=lambda x: x[1])[0] if hour_counts else 0
+        with self._lock:
+            # Count total commands
+            total_commands = sum(self.command_counts.values())
+            
+            # Get most popular commands
+            popular_commands = [cmd for cmd, _ in self.command_counts.most_common(5)]
+            
+            # Determine peak usage time
+            peak_hour = max(range(24), key=self.hour_counts.__getitem__)
         peak_usage_time = f"{peak_hour:02d}:00 - {(peak_hour + 1) % 24:02d}:00 UTC"
         
         # Calculate average response time (placeholder)
@@ -350,16 +733,18 @@ class SystemMonitor:
         
         # Count activities per user
         user_activity_counts = {}
-        for user_id, activities in self.user_activity.items():
-            user_activity_counts[user_id] = len(activities)
+        with self._lock:
+            for user_id, activities in self.user_activity.items():
+                user_activity_counts[user_id] = len(activities)
         
         # Get top users by activity
-        top_users = sorted(user_activity_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_users = heapq.nlargest(10, user_activity_counts.items(), key=operator.itemgetter(1))
         
         # Format top users for display
-        top_users_formatted = ""
-        for i, (user_id, count) in enumerate(top_users, 1):
-            top_users_formatted += f"{i}. User {user_id}: {count} activities\n"
+        top_users_formatted = "".join(
+            f"{i}. User {user_id}: {count} activities\n"
+            for i, (user_id, count) in enumerate(top_users, 1)
+        )
         
         # Get new users in the last 24 hours
         new_users_24h = self._get_new_users_in_period(hours=24)
@@ -442,17 +827,26 @@ class SystemMonitor:
         Returns:
             List of log entries
         """
-        # Filter logs
-        filtered_logs = list(self.logs)
-        
-        if level:
-            filtered_logs = [log for log in filtered_logs if log.get("level") == level]
+        def select(logs):
+            # Walk logs newest first, filtering lazily and stopping after count matches
+            filtered_logs = reversed(logs)
+            
+            if level:
+                filtered_logs = (log for log in filtered_logs if log.level == level)
+            
+            if user_id is not None:
+                filtered_logs = (log for log in filtered_logs if log.user_id == user_id)
+            
+            return list(itertools.islice(filtered_logs, count))
         
-        if user_id is not None:
-            filtered_logs = [log for log in filtered_logs if log.get("user_id") == user_id]
+        try:
+            recent_logs = select(self.logs)
+        except RuntimeError:
+            # Another thread appended mid-walk; retry on a snapshot
+            recent_logs = select(list(self.logs))
         
-        # Return most recent logs
-        return list(reversed(filtered_logs))[:count]
+        # Return most recent logs with readable timestamps
+        return [log.to_dict() for log in recent_logs]
     
     def _get_active_users_in_period(self, hours: int = None, days: int = None) -> List[int]:
         """
@@ -470,20 +864,13 @@ class SystemMonitor:
         
         # Calculate cutoff time
         if days is not None:
-            cutoff_time = datetime.now() - timedelta(days=days)
+            cutoff_time = time.time() - days * 86400
         else:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        # Find active users
-        active_users = set()
-        for user_id, activities in self.user_activity.items():
-            for activity in activities:
-                activity_time = datetime.fromisoformat(activity["timestamp"])
-                if activity_time >= cutoff_time:
-                    active_users.add(user_id)
-                    break
+            cutoff_time = time.time() - hours * 3600
         
-        return list(active_users)
+        # Find active users (users whose last activity is after the cutoff time)
+        with self._lock:
+            return [user_id for user_id, last_seen in self.last_seen.items() if last_seen >= cutoff_time]
     
     def _get_new_users_in_period(self, hours: int = None, days: int = None) -> List[int]:
         """
@@ -501,43 +888,13 @@ class SystemMonitor:
         
         # Calculate cutoff time
         if days is not None:
-            cutoff_time = datetime.now() - timedelta(days=days)
+            cutoff_time = time.time() - days * 86400
         else:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
+            cutoff_time = time.time() - hours * 3600
         
         # Find new users (users whose first activity is after the cutoff time)
-        new_users = []
-        for user_id, activities in self.user_activity.items():
-            if activities:
-                first_activity_time = datetime.fromisoformat(activities[0]["timestamp"])
-                if first_activity_time >= cutoff_time:
-                    new_users.append(user_id)
-        
-        return new_users
-    
-    def _format_timedelta(self, td: timedelta) -> str:
-        """
-        Format a timedelta object as a human-readable string.
-        
-        Args:
-            td: Timedelta object
-            
-        Returns:
-            Formatted string
-        """
-        total_seconds = int(td.total_seconds())
-        days, remainder = divmod(total_seconds, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        
-        if days > 0:
-            return f"{days}d {hours}h {minutes}m {seconds}s"
-        elif hours > 0:
-            return f"{hours}h {minutes}m {seconds}s"
-        elif minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds}s"
+        with self._lock:
+            return [user_id for user_id, first_seen in self.first_seen.items() if first_seen >= cutoff_time]
 
 
 class PerformanceTracker:
@@ -554,47 +911,62 @@ class PerformanceTracker:
         
         Args:
             max_samples: Maximum number of samples to keep for each metric
+            
+        Raises:
+            ValueError: If max_samples is less than 1
         """
+        if max_samples < 1:
+            raise ValueError("max_samples must be at least 1")
         self.max_samples = max_samples
+        
+        # Each metric is stored column-wise: one bounded deque per sample field
         self.metrics = {
-            "response_time": deque(maxlen=max_samples),
-            "cpu_usage": deque(maxlen=max_samples),
-            "memory_usage": deque(maxlen=max_samples),
-            "api_calls": deque(maxlen=max_samples),
+            "response_time": self._new_series("value"),
+            "cpu_usage": self._new_series("value"),
+            "memory_usage": self._new_series("value"),
+            "api_calls": self._new_series("api_name", "success", "response_time"),
         }
+        
+        # Running totals over the samples currently held, updated on append and eviction
+        self._response_time_sum = 0.0
+        self._api_success_count = 0
+        self._api_response_time_sum = 0.0
+        
+        # Keeps columns and running totals consistent between the scheduler and readers
+        self._lock = threading.Lock()
+        
         self.start_time = datetime.now()
         self.last_update = datetime.now()
         
-        # Start background thread for periodic updates
-        self.update_active = True
-        self.update_thread = threading.Thread(target=self._update_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        _start_cpu_sampling()
+        self._process = psutil.Process(os.getpid())
+        
+        # Schedule periodic CPU and memory sampling, starting once the CPU sampler has a real value
+        self._jobs = [_scheduler.schedule(5, self._update_metrics, delay=5)]
         
         logger.info("Performance tracker initialized")
     
     def __del__(self):
         """Clean up resources when the object is destroyed."""
-        self.update_active = False
-        if hasattr(self, 'update_thread') and self.update_thread.is_alive():
-            self.update_thread.join(timeout=1.0)
+        for job_id in getattr(self, '_jobs', []):
+            _scheduler.cancel(job_id)
     
-    def _update_loop(self):
-        """Background thread for periodic metric updates."""
-        while self.update_active:
-            try:
-                # Update CPU and memory usage
-                self.track_cpu_usage()
-                self.track_memory_usage()
-                
-                # Sleep for 5 seconds
-                for _ in range(5):
-                    if not self.update_active:
-                        break
-                    time.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in performance update loop: {e}")
-                time.sleep(5)  # Sleep and retry
+    def _new_series(self, *fields: str) -> Dict[str, deque]:
+        """
+        Create empty column storage for a metric.
+        
+        Args:
+            fields: Sample fields stored in addition to the timestamp
+            
+        Returns:
+            Dictionary mapping each field to a bounded deque
+        """
+        return {field: deque(maxlen=self.max_samples) for field in ("timestamp",) + fields}
+    
+    def _update_metrics(self):
+        """Sample CPU and memory usage (run periodically by the scheduler)."""
+        self.track_cpu_usage()
+        self.track_memory_usage()
     
     def track_response_time(self, start_time: float, end_time: float = None):
         """
@@ -609,30 +981,33 @@ class PerformanceTracker:
         
         response_time = (end_time - start_time) * 1000  # Convert to milliseconds
         
-        self.metrics["response_time"].append({
-            "timestamp": datetime.now().isoformat(),
-            "value": response_time,
-        })
+        series = self.metrics["response_time"]
+        with self._lock:
+            if len(series["value"]) == self.max_samples:
+                self._response_time_sum -= series["value"][0]
+            
+            series["timestamp"].append(time.time())
+            series["value"].append(response_time)
+            self._response_time_sum += response_time
     
     def track_cpu_usage(self):
-        """Track CPU usage."""
-        cpu_percent = psutil.cpu_percent(interval=0.1)
+        """Track CPU usage as last sampled on the scheduler thread."""
+        cpu_percent = _cpu_percent
         
-        self.metrics["cpu_usage"].append({
-            "timestamp": datetime.now().isoformat(),
-            "value": cpu_percent,
-        })
+        series = self.metrics["cpu_usage"]
+        with self._lock:
+            series["timestamp"].append(time.time())
+            series["value"].append(cpu_percent)
     
     def track_memory_usage(self):
         """Track memory usage."""
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
+        memory_info = self._process.memory_info()
         memory_mb = memory_info.rss / (1024 * 1024)  # Convert to MB
         
-        self.metrics["memory_usage"].append({
-            "timestamp": datetime.now().isoformat(),
-            "value": memory_mb,
-        })
+        series = self.metrics["memory_usage"]
+        with self._lock:
+            series["timestamp"].append(time.time())
+            series["value"].append(memory_mb)
     
     def track_api_call(self, api_name: str, success: bool, response_time: float):
         """
@@ -643,12 +1018,18 @@ class PerformanceTracker:
             success: Whether the call was successful
             response_time: Response time in milliseconds
         """
-        self.metrics["api_calls"].append({
-            "timestamp": datetime.now().isoformat(),
-            "api_name": api_name,
-            "success": success,
-            "response_time": response_time,
-        })
+        series = self.metrics["api_calls"]
+        with self._lock:
+            if len(series["timestamp"]) == self.max_samples:
+                self._api_success_count -= bool(series["success"][0])
+                self._api_response_time_sum -= series["response_time"][0]
+            
+            series["timestamp"].append(time.time())
+            series["api_name"].append(api_name)
+            series["success"].append(success)
+            series["response_time"].append(response_time)
+            self._api_success_count += bool(success)
+            self._api_response_time_sum += response_time
     
     def get_metrics(self) -> Dict:
         """
@@ -657,25 +1038,25 @@ class PerformanceTracker:
         Returns:
             Performance metrics
         """
-        # Calculate average response time
-        response_times = [m["value"] for m in self.metrics["response_time"]]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        # Get latest CPU usage
-        cpu_usage = self.metrics["cpu_usage"][-1]["value"] if self.metrics["cpu_usage"] else 0
-        
-        # Get latest memory usage
-        memory_usage = self.metrics["memory_usage"][-1]["value"] if self.metrics["memory_usage"] else 0
-        
-        # Calculate API success rate
-        api_calls = list(self.metrics["api_calls"])
-        total_api_calls = len(api_calls)
-        successful_api_calls = sum(1 for call in api_calls if call["success"])
-        api_success_rate = (successful_api_calls / total_api_calls * 100) if total_api_calls > 0 else 100
-        
-        # Calculate average API response time
-        api_response_times = [call["response_time"] for call in api_calls]
-        avg_api_response_time = sum(api_response_times) / len(api_response_times) if api_response_times else 0
+        with self._lock:
+            # Calculate average response time
+            response_count = len(self.metrics["response_time"]["value"])
+            avg_response_time = self._response_time_sum / response_count if response_count else 0
+            
+            # Get latest CPU usage
+            cpu_values = self.metrics["cpu_usage"]["value"]
+            cpu_usage = cpu_values[-1] if cpu_values else 0
+            
+            # Get latest memory usage
+            memory_values = self.metrics["memory_usage"]["value"]
+            memory_usage = memory_values[-1] if memory_values else 0
+            
+            # Calculate API success rate
+            total_api_calls = len(self.metrics["api_calls"]["timestamp"])
+            api_success_rate = (self._api_success_count / total_api_calls * 100) if total_api_calls > 0 else 100
+            
+            # Calculate average API response time
+            avg_api_response_time = self._api_response_time_sum / total_api_calls if total_api_calls > 0 else 0
         
         return {
             "response_time": round(avg_response_time, 2),
@@ -683,7 +1064,7 @@ class PerformanceTracker:
             "memory_usage": round(memory_usage, 2),
             "api_success_rate": round(api_success_rate, 2),
             "api_response_time": round(avg_api_response_time, 2),
-            "uptime": self._format_timedelta(datetime.now() - self.start_time),
+            "uptime": _format_uptime(int((datetime.now() - self.start_time).total_seconds())),
             "last_update": datetime.now().isoformat(),
         }
     
@@ -701,42 +1082,33 @@ class PerformanceTracker:
         if metric_name not in self.metrics:
             return []
         
-        # Return most recent samples
-        return list(reversed(list(self.metrics[metric_name])))[:count]
+        # Assemble the most recent samples, newest first, from the field columns
+        series = self.metrics[metric_name]
+        with self._lock:
+            rows = list(zip(*[itertools.islice(reversed(values), count) for values in series.values()]))
+        
+        history = []
+        for row in rows:
+            sample = dict(zip(series, row))
+            sample["timestamp"] = _isoformat(sample["timestamp"])
+            history.append(sample)
+        return history
     
     def reset_metrics(self):
         """Reset all metrics."""
-        for metric in self.metrics:
-            self.metrics[metric].clear()
+        with self._lock:
+            for series in self.metrics.values():
+                for values in series.values():
+                    values.clear()
+            
+            self._response_time_sum = 0.0
+            self._api_success_count = 0
+            self._api_response_time_sum = 0.0
         
         self.start_time = datetime.now()
         self.last_update = datetime.now()
         
         logger.info("Performance metrics reset")
-    
-    def _format_timedelta(self, td: timedelta) -> str:
-        """
-        Format a timedelta object as a human-readable string.
-        
-        Args:
-            td: Timedelta object
-            
-        Returns:
-            Formatted string
-        """
-        total_seconds = int(td.total_seconds())
-        days, remainder = divmod(total_seconds, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        
-        if days > 0:
-            return f"{days}d {hours}h {minutes}m {seconds}s"
-        elif hours > 0:
-            return f"{hours}h {minutes}m {seconds}s"
-        elif minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds}s"
 
 
 def main():
@@ -1,7 +1,80 @@
+import functools
 import json
+import mmap
 import os
 import re
-from datetime import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    from re import _parser as _regex_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _regex_parser
+
+# Indent data files for hand editing; compact output is smaller and faster to reload
+PRETTY_JSON = False
+
+# Use orjson for the data files when available
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if PRETTY_JSON else None)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        if PRETTY_JSON:
+            return json.dumps(obj, indent=4).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Optional Aho-Corasick matcher for "contains" triggers
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Seconds a regex trigger may spend on one message before it is disabled
+REGEX_TIMEOUT = 0.05
+
+# Use the "regex" module for regex triggers when available; unlike re it can stop a
+# search that backtracks catastrophically on a badly written pattern
+try:
+    import regex
+
+    _REGEX_ERRORS = (re.error, regex.error)
+
+    def _compile_regex(pattern):
+        return regex.compile(pattern, regex.IGNORECASE | regex.VERSION0)
+
+    def _regex_search(compiled, text):
+        return compiled.search(text, timeout=REGEX_TIMEOUT)
+except ImportError:
+    regex = None
+    _REGEX_ERRORS = (re.error,)
+
+    def _compile_regex(pattern):
+        return re.compile(pattern, re.IGNORECASE)
+
+    def _regex_search(compiled, text):
+        return compiled.search(text)
+
+# Placeholders filled in by _format_response: {crm_<field>} and {regex_group_<n>}
+_PLACEHOLDER_RE = re.compile(r"\{(?:crm_([^{}]+)|regex_group_([1-9][0-9]*))\}")
+
+# Characters whose IGNORECASE matches always lowercase to themselves. Other ASCII
+# letters are excluded because "i" and "s" also match "ı" and "ſ" under re.IGNORECASE
+_PREFILTER_CHARS = frozenset("abcdefghjklmnopqrtuvwxyzABCDEFGHJKLMNOPQRTUVWXYZ0123456789 !\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~")
+
+# Data files at least this large are parsed from a memory map instead of a copy (bytes)
+MMAP_THRESHOLD = 256 * 1024
+
+# Number of recent message texts whose trigger match is remembered
+MATCH_CACHE_SIZE = 2048
 
 DATA_DIR = "/home/ubuntu/workspace/novaxa_bot/data"
 TRIGGERS_FILE = os.path.join(DATA_DIR, "triggers.json")
@@ -10,47 +83,239 @@ MAPPINGS_FILE = os.path.join(DATA_DIR, "mappings.json")
 
 class SmartReplyEngine:
     def __init__(self, crm_module=None):
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
+        os.makedirs(DATA_DIR, exist_ok=True)
         self.triggers = self._load_data(TRIGGERS_FILE, {})
         self.responses = self._load_data(RESPONSES_FILE, {})
         self.mappings = self._load_data(MAPPINGS_FILE, [])
         self.crm_module = crm_module
 
+        # Next ID number per collection, continuing after the highest existing ID
+        self._next_ids = {
+            "trigger": self._max_id_number(self.triggers, len(self.triggers)) + 1,
+            "response": self._max_id_number(self.responses, len(self.responses)) + 1,
+            "mapping": self._max_id_number((m.get("mapping_id") for m in self.mappings), len(self.mappings)) + 1,
+        }
+
+        # Data files with unsaved changes; written by flush()
+        self._dirty = {"triggers": False, "responses": False, "mappings": False}
+        self._bulk = False
+        self._bulk_timestamp = None
+
+        # Compiled regex triggers by trigger_id (None for invalid patterns), and a
+        # literal each one requires so most non-matching messages skip the search
+        self._compiled = {}
+        self._regex_literals = {}
+        for trigger in self.triggers.values():
+            # Lowercase phrases once here instead of on every message
+            trigger["trigger_phrase_lc"] = trigger.get("trigger_phrase", "").lower()
+            self._compile_trigger(trigger)
+
+        # Triggers ordered by priority, rebuilt lazily after changes
+        self._sorted_triggers = None
+        self._exact_index = {}
+        self._contains_automaton = None
+        self._scan_triggers = []
+
+        # Trigger match per preprocessed message text, cleared when triggers change
+        self._cached_find_trigger = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(self._find_trigger)
+
+        # Mappings grouped by trigger_id, each group ordered by order_in_sequence
+        self._mappings_by_trigger = defaultdict(list)
+        for mapping in self.mappings:
+            self._index_mapping(mapping)
+
     def _load_data(self, file_path, default_data):
-        if not os.path.exists(file_path):
+        try:
+            with open(file_path, "rb") as f:
+                # orjson can parse straight from the page cache; json needs bytes
+                if orjson is not None and os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            return _json_loads(view)
+                return _json_loads(f.read())
+        except FileNotFoundError:
             # Create empty file if it doesn't exist
-            with open(file_path, "w") as f:
+            with open(file_path, "wb") as f:
                 if isinstance(default_data, list):
-                    json.dump([], f)
+                    f.write(_json_dumps([]))
                 else:
-                    json.dump({}, f)
+                    f.write(_json_dumps({}))
             return default_data
-        try:
-            with open(file_path, "r") as f:
-                return json.load(f)
         except json.JSONDecodeError:
             return default_data
 
+    def _max_id_number(self, ids, default=0):
+        # Highest numeric suffix among IDs such as "TRG_007"
+        highest = default
+        for record_id in ids:
+            try:
+                highest = max(highest, int(str(record_id).rsplit("_", 1)[1]))
+            except (IndexError, ValueError):
+                continue
+        return highest
+
+    def _next_id(self, kind, prefix):
+        number = self._next_ids[kind]
+        self._next_ids[kind] += 1
+        return f"{prefix}_{number:03d}"
+
+    def _compile_trigger(self, trigger):
+        trigger_id = trigger.get("trigger_id")
+        self._compiled.pop(trigger_id, None)
+        self._regex_literals.pop(trigger_id, None)
+        if trigger.get("match_type") != "regex":
+            return
+        try:
+            self._compiled[trigger_id] = _compile_regex(trigger.get("trigger_phrase", ""))
+        except _REGEX_ERRORS:
+            # Invalid regex, keep the trigger but never match it
+            print(f"Warning: Invalid regex for trigger {trigger_id}: {trigger.get('trigger_phrase')}")
+            self._compiled[trigger_id] = None
+            return
+        self._regex_literals[trigger_id] = self._required_literal(trigger.get("trigger_phrase", ""))
+
+    def _required_literal(self, pattern):
+        # Longest run of plain characters at the top level of the pattern; any match
+        # must contain it. Groups, repeats and alternations end a run.
+        try:
+            parsed = _regex_parser.parse(pattern, re.IGNORECASE)
+        except Exception:
+            return None
+        longest = ""
+        run = []
+        for op, value in list(parsed) + [(None, None)]:
+            if op is _regex_parser.LITERAL and chr(value) in _PREFILTER_CHARS:
+                run.append(chr(value))
+                continue
+            if len(run) > len(longest):
+                longest = "".join(run)
+            run = []
+        return longest.lower() or None
+
+    def _get_sorted_triggers(self):
+        if self._sorted_triggers is None:
+            # Lower number means higher priority
+            self._sorted_triggers = sorted(self.triggers.values(), key=lambda t: t.get("priority", 10))
+            self._build_exact_index()
+            self._build_contains_automaton()
+            # Triggers that still have to be tested one by one, with their sorted positions
+            scan_types = ("regex",) if self._contains_automaton is not None else ("regex", "contains")
+            self._scan_triggers = [
+                (position, trigger)
+                for position, trigger in enumerate(self._sorted_triggers)
+                if trigger.get("match_type", "exact") in scan_types
+            ]
+        return self._sorted_triggers
+
+    def _build_exact_index(self):
+        # Map each "exact" phrase to the positions of its triggers in the sorted list
+        self._exact_index = {}
+        for position, trigger in enumerate(self._sorted_triggers):
+            if trigger.get("match_type", "exact") == "exact":
+                self._exact_index.setdefault(trigger["trigger_phrase_lc"], []).append(position)
+
+    def _find_exact_trigger(self, processed_text):
+        # Position of the highest-priority active "exact" trigger for the text
+        for position in self._exact_index.get(processed_text, ()):
+            if self._sorted_triggers[position].get("is_active", False):
+                return position
+        return None
+
+    def _build_contains_automaton(self):
+        # Map each "contains" phrase to the positions of its triggers in the sorted list
+        self._contains_automaton = None
+        if ahocorasick is None:
+            return
+        positions = defaultdict(list)
+        for position, trigger in enumerate(self._sorted_triggers):
+            if trigger.get("match_type") == "contains":
+                positions[trigger["trigger_phrase_lc"]].append(position)
+        # An empty phrase matches every message and cannot be added, so keep the plain scan
+        if not positions or "" in positions:
+            return
+        automaton = ahocorasick.Automaton()
+        for phrase, phrase_positions in positions.items():
+            automaton.add_word(phrase, phrase_positions)
+        automaton.make_automaton()
+        self._contains_automaton = automaton
+
+    def _find_contains_trigger(self, processed_text):
+        # Position of the highest-priority active "contains" trigger found in the text
+        best = None
+        for _, positions in self._contains_automaton.iter(processed_text):
+            for position in positions:
+                if best is not None and position >= best:
+                    break
+                if self._sorted_triggers[position].get("is_active", False):
+                    best = position
+                    break
+        return best
+
+    def _index_mapping(self, mapping):
+        group = self._mappings_by_trigger[mapping.get("trigger_id")]
+        group.append(mapping)
+        group.sort(key=lambda m: m.get("order_in_sequence", 1))
+
+    def _write_data(self, file_path, data):
+        # Write to a temporary file and rename so readers never see a partial file
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp_path, file_path)
+
+    def _mark_dirty(self, name):
+        self._dirty[name] = True
+        if not self._bulk:
+            self.flush()
+
     def _save_triggers(self):
-        with open(TRIGGERS_FILE, "w") as f:
-            json.dump(self.triggers, f, indent=4)
+        self._mark_dirty("triggers")
 
     def _save_responses(self):
-        with open(RESPONSES_FILE, "w") as f:
-            json.dump(self.responses, f, indent=4)
+        self._mark_dirty("responses")
 
     def _save_mappings(self):
-        with open(MAPPINGS_FILE, "w") as f:
-            json.dump(self.mappings, f, indent=4)
+        self._mark_dirty("mappings")
+
+    def flush(self):
+        for name, file_path, data in (
+            ("triggers", TRIGGERS_FILE, self.triggers),
+            ("responses", RESPONSES_FILE, self.responses),
+            ("mappings", MAPPINGS_FILE, self.mappings),
+        ):
+            if self._dirty[name]:
+                self._write_data(file_path, data)
+                self._dirty[name] = False
+
+    @contextmanager
+    def bulk(self):
+        # Defer saving until the block ends, then write each changed file once.
+        # Records added in the block share one created_at/updated_at timestamp.
+        previous = self._bulk
+        self._bulk = True
+        if not previous:
+            self._bulk_timestamp = self._timestamp()
+        try:
+            yield self
+        finally:
+            self._bulk = previous
+            if not previous:
+                self._bulk_timestamp = None
+                self.flush()
+
+    def _timestamp(self):
+        if self._bulk_timestamp is not None:
+            return self._bulk_timestamp
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
     # --- Trigger Management ---
     def add_trigger(self, trigger_phrase, match_type, intent=None, priority=10, is_active=True):
-        trigger_id = f"TRG_{len(self.triggers) + 1:03d}"
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        trigger_id = self._next_id("trigger", "TRG")
+        timestamp = self._timestamp()
         self.triggers[trigger_id] = {
             "trigger_id": trigger_id,
             "trigger_phrase": trigger_phrase,
+            "trigger_phrase_lc": trigger_phrase.lower(),
             "match_type": match_type,  # "exact", "contains", "regex"
             "intent": intent,
             "is_active": is_active,
@@ -58,13 +323,16 @@ class SmartReplyEngine:
             "created_at": timestamp,
             "updated_at": timestamp
         }
+        self._compile_trigger(self.triggers[trigger_id])
+        self._sorted_triggers = None
+        self._cached_find_trigger.cache_clear()
         self._save_triggers()
         return True, f"Trigger {trigger_id} added successfully."
 
     # --- Response Management ---
     def add_response(self, response_text, response_type="text", attachments=None, follow_up_action_id=None, is_active=True):
-        response_id = f"RES_{len(self.responses) + 1:03d}"
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        response_id = self._next_id("response", "RES")
+        timestamp = self._timestamp()
         self.responses[response_id] = {
             "response_id": response_id,
             "response_text": response_text,
@@ -85,8 +353,8 @@ class SmartReplyEngine:
         if response_id not in self.responses:
             return False, f"Response ID {response_id} not found."
         
-        mapping_id = f"MAP_{len(self.mappings) + 1:03d}"
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        mapping_id = self._next_id("mapping", "MAP")
+        timestamp = self._timestamp()
         new_mapping = {
             "mapping_id": mapping_id,
             "trigger_id": trigger_id,
@@ -98,6 +366,7 @@ class SmartReplyEngine:
             "updated_at": timestamp
         }
         self.mappings.append(new_mapping)
+        self._index_mapping(new_mapping)
         self._save_mappings()
         return True, f"Mapping {mapping_id} added successfully."
 
@@ -106,66 +375,99 @@ class SmartReplyEngine:
 
     def _format_response(self, response_text, crm_data=None, matched_groups=None):
         # Basic placeholder replacement
-        if crm_data:
-            for key, value in crm_data.items():
-                response_text = response_text.replace(f"{{crm_{key}}}", str(value))
-        if matched_groups:
-            for i, group in enumerate(matched_groups):
-                response_text = response_text.replace(f"{{regex_group_{i+1}}}", str(group))
+        if "{" not in response_text or not (crm_data or matched_groups):
+            return response_text
+
+        def replace(match):
+            crm_key, group_number = match.groups()
+            if crm_key is not None:
+                if crm_data and crm_key in crm_data:
+                    return str(crm_data[crm_key])
+            elif matched_groups and int(group_number) <= len(matched_groups):
+                return str(matched_groups[int(group_number) - 1])
+            # Unknown placeholders are left as they are
+            return match.group(0)
+
         # Add more complex placeholder logic as needed (e.g. {pricelist_url})
         # For now, this is a simple implementation.
-        return response_text
+        return _PLACEHOLDER_RE.sub(replace, response_text)
 
-    def process_message(self, message_text, user_telegram_id=None, crm_data=None):
-        processed_text = self._preprocess_message(message_text)
+    def _find_trigger(self, processed_text):
         matched_trigger = None
         regex_groups = None
-
-        # Sort triggers by priority (lower number means higher priority)
-        sorted_triggers = sorted(self.triggers.values(), key=lambda t: t.get("priority", 10))
-
-        for trigger in sorted_triggers:
-            if not trigger.get("is_active", False):
+        self._get_sorted_triggers()
+
+        # Exact phrases are a dictionary lookup and the automaton finds the best "contains"
+        # trigger in one pass, so only higher-priority triggers of other types are left to check
+        best_position = self._find_exact_trigger(processed_text)
+        if self._contains_automaton is not None:
+            contains_position = self._find_contains_trigger(processed_text)
+            if contains_position is not None and (best_position is None or contains_position < best_position):
+                best_position = contains_position
+        stop_position = best_position if best_position is not None else len(self._sorted_triggers)
+
+        # Bind lookups used on every iteration
+        compiled = self._compiled
+        regex_literals = self._regex_literals
+
+        for position, trigger in self._scan_triggers:
+            if position >= stop_position:
+                break
+            get = trigger.get
+            if not get("is_active", False):
                 continue
 
-            trigger_phrase = trigger.get("trigger_phrase", "").lower()
-            match_type = trigger.get("match_type", "exact")
+            if get("match_type") == "contains":
+                if trigger["trigger_phrase_lc"] in processed_text:
+                    matched_trigger = trigger
+                    break
+                continue
 
-            if match_type == "exact" and processed_text == trigger_phrase:
-                matched_trigger = trigger
-                break
-            elif match_type == "contains" and trigger_phrase in processed_text:
+            trigger_id = get("trigger_id")
+            pattern = compiled.get(trigger_id)
+            if pattern is None:
+                continue
+            literal = regex_literals.get(trigger_id)
+            if literal and literal not in processed_text:
+                continue
+            try:
+                match = _regex_search(pattern, processed_text)
+            except TimeoutError:
+                # Pathological pattern, stop running it for every message
+                print(f"Warning: Regex for trigger {trigger_id} timed out and was disabled: {get('trigger_phrase')}")
+                compiled[trigger_id] = None
+                self._cached_find_trigger.cache_clear()
+                continue
+            if match:
                 matched_trigger = trigger
+                regex_groups = match.groups()
                 break
-            elif match_type == "regex":
-                try:
-                    match = re.search(trigger_phrase, processed_text, re.IGNORECASE)
-                    if match:
-                        matched_trigger = trigger
-                        regex_groups = match.groups()
-                        break
-                except re.error:
-                    # Invalid regex, skip this trigger or log an error
-                    print(f"Warning: Invalid regex for trigger {trigger.get('trigger_id')}: {trigger_phrase}")
-                    continue
-        
+
+        if not matched_trigger and best_position is not None:
+            matched_trigger = self._sorted_triggers[best_position]
+
+        return matched_trigger, regex_groups
+
+    def process_message(self, message_text, user_telegram_id=None, crm_data=None):
+        processed_text = self._preprocess_message(message_text)
+        matched_trigger, regex_groups = self._cached_find_trigger(processed_text)
+
         if not matched_trigger:
             return None # Or a default response object
 
-        # Find mappings for the matched trigger
-        applicable_mappings = []
-        for mapping in self.mappings:
-            if mapping.get("trigger_id") == matched_trigger.get("trigger_id") and mapping.get("is_active", False):
-                # TODO: Implement condition evaluation (e.g., CRM based)
-                # For now, all active mappings for the trigger are considered applicable
-                applicable_mappings.append(mapping)
-        
-        if not applicable_mappings:
+        # Find mappings for the matched trigger, already ordered by order_in_sequence
+        # TODO: Implement condition evaluation (e.g., CRM based)
+        # For now, all active mappings for the trigger are considered applicable
+        # and the first one in sequence is used
+        selected_mapping = None
+        for mapping in self._mappings_by_trigger.get(matched_trigger.get("trigger_id"), ()):
+            if mapping.get("is_active", False):
+                selected_mapping = mapping
+                break
+
+        if not selected_mapping:
             return None
 
-        # Sort by order_in_sequence if multiple responses are planned (not fully implemented here)
-        # For now, take the first applicable mapping
-        selected_mapping = sorted(applicable_mappings, key=lambda m: m.get("order_in_sequence", 1))[0]
         response_id = selected_mapping.get("response_id")
         
         if response_id and response_id in self.responses:
@@ -205,23 +507,25 @@ if __name__ == "__main__":
             os.remove(f_path)
     sre = SmartReplyEngine(crm_module=DummyCRM()) # Re-initialize to create files
 
-    # Add some triggers
-    sre.add_trigger("hello", "exact", "greeting")
-    sre.add_trigger("τιμή", "contains", "pricing_query", priority=5)
-    sre.add_trigger(r"how much is (.+)", "regex", "pricing_query_specific")
-    sre.add_trigger("my name is", "contains", "name_mention")
-
-    # Add some responses
-    sre.add_response("Hello there {crm_name}! How can I help you today?", "text") # RES_001
-    sre.add_response("For pricing information, please visit {pricelist_url} or tell me what product you are interested in.", "markdown") # RES_002
-    sre.add_response("The price for {regex_group_1} is $X.XX. More details at {pricelist_url}", "markdown") # RES_003
-    sre.add_response("Nice to meet you, {crm_name}! Your status is {crm_status}.", "text") # RES_004
-
-    # Add some mappings
-    sre.add_mapping("TRG_001", "RES_001") # hello -> Hello there {crm_name}!
-    sre.add_mapping("TRG_002", "RES_002") # τιμή -> For pricing information...
-    sre.add_mapping("TRG_003", "RES_003") # how much is (.+) -> The price for {regex_group_1}...
-    sre.add_mapping("TRG_004", "RES_004") # my name is -> Nice to meet you, {crm_name}!
+    # Add everything in one batch so each data file is written once
+    with sre.bulk():
+        # Add some triggers
+        sre.add_trigger("hello", "exact", "greeting")
+        sre.add_trigger("τιμή", "contains", "pricing_query", priority=5)
+        sre.add_trigger(r"how much is (.+)", "regex", "pricing_query_specific")
+        sre.add_trigger("my name is", "contains", "name_mention")
+
+        # Add some responses
+        sre.add_response("Hello there {crm_name}! How can I help you today?", "text") # RES_001
+        sre.add_response("For pricing information, please visit {pricelist_url} or tell me what product you are interested in.", "markdown") # RES_002
+        sre.add_response("The price for {regex_group_1} is $X.XX. More details at {pricelist_url}", "markdown") # RES_003
+        sre.add_response("Nice to meet you, {crm_name}! Your status is {crm_status}.", "text") # RES_004
+
+        # Add some mappings
+        sre.add_mapping("TRG_001", "RES_001") # hello -> Hello there {crm_name}!
+        sre.add_mapping("TRG_002", "RES_002") # τιμή -> For pricing information...
+        sre.add_mapping("TRG_003", "RES_003") # how much is (.+) -> The price for {regex_group_1}...
+        sre.add_mapping("TRG_004", "RES_004") # my name is -> Nice to meet you, {crm_name}!
 
     print("--- Test 1: Hello (User 123) ---")
     result1 = sre.process_message("hello", user_telegram_id="123")
@@ -16,70 +16,84 @@ import logging
 import json
 import time
 import unittest
-import tempfile
-import shutil
+import pytest
 from datetime import datetime
 from typing import Dict, List, Optional, Union, Any, Callable
 
 # Import deployment modules
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from deploy import Deployment
 from deployment_config import DeploymentConfig
 
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
 logger = logging.getLogger(__name__)
 
+# Use orjson for the test config files when available
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
+
+def _load_json(path: str) -> Any:
+    """Read and parse the JSON file at path."""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
 
 class TestDeploymentConfig(unittest.TestCase):
     """Test cases for the DeploymentConfig class."""
     
+    # Test configuration shared by every test in the class
+    test_config = {
+        "environments": {
+            "test": {
+                "name": "Test Environment",
+                "description": "Environment for testing",
+                "host": "test.example.com",
+                "port": 8443,
+                "use_webhook": True,
+                "webhook_url": "https://test.example.com/webhook",
+                "certificate": "certs/test.pem",
+                "env_vars": {
+                    "DEBUG": "true",
+                    "LOG_LEVEL": "DEBUG",
+                },
+                "service_name": "telegram-bot-test",
+            },
+        },
+        "default_environment": "test",
+        "bot_settings": {
+            "name": "Test Bot",
+            "version": "1.0.0",
+        },
+    }
+    
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the shared test configuration once."""
+        cls._config_bytes = _json_dumps(cls.test_config)
+    
+    @pytest.fixture(autouse=True)
+    def _use_tmp_path(self, tmp_path):
+        """Give each test its own pytest-managed temporary directory."""
+        self.test_dir = str(tmp_path)
+    
     def setUp(self):
         """Set up test environment."""
-        # Create a temporary directory for test files
-        self.test_dir = tempfile.mkdtemp()
         self.config_file = os.path.join(self.test_dir, "test_config.json")
         
-        # Create a test configuration
-        self.test_config = {
-            "environments": {
-                "test": {
-                    "name": "Test Environment",
-                    "description": "Environment for testing",
-                    "host": "test.example.com",
-                    "port": 8443,
-                    "use_webhook": True,
-                    "webhook_url": "https://test.example.com/webhook",
-                    "certificate": "certs/test.pem",
-                    "env_vars": {
-                        "DEBUG": "true",
-                        "LOG_LEVEL": "DEBUG",
-                    },
-                    "service_name": "telegram-bot-test",
-                },
-            },
-            "default_environment": "test",
-            "bot_settings": {
-                "name": "Test Bot",
-                "version": "1.0.0",
-            },
-        }
-        
         # Write test configuration to file
-        with open(self.config_file, 'w') as f:
-            json.dump(self.test_config, f)
+        with open(self.config_file, 'wb') as f:
+            f.write(self._config_bytes)
         
         # Create DeploymentConfig instance
         self.config_manager = DeploymentConfig(config_file=self.config_file)
     
-    def tearDown(self):
-        """Clean up test environment."""
-        # Remove temporary directory
-        shutil.rmtree(self.test_dir)
-    
     def test_load_config(self):
         """Test loading configuration from a file."""
         # Create a new DeploymentConfig instance
@@ -107,38 +121,11 @@ class TestDeploymentConfig(unittest.TestCase):
         self.assertTrue(os.path.exists(new_config_file))
         
         # Load saved configuration
-        with open(new_config_file, 'r') as f:
-            saved_config = json.load(f)
+        saved_config = _load_json(new_config_file)
         
         # Check saved configuration
         self.assertEqual(saved_config["bot_settings"]["version"], "1.1.0")
     
-    def test_get_environment(self):
-        """Test getting environment configuration."""
-        # Get environment
-        env_config = self.config_manager.get_environment("test")
-        
-        # Check environment configuration
-        self.assertEqual(env_config["name"], "Test Environment")
-        self.assertEqual(env_config["host"], "test.example.com")
-    
-    def test_get_environments(self):
-        """Test getting all environment configurations."""
-        # Get environments
-        environments = self.config_manager.get_environments()
-        
-        # Check environments
-        self.assertIn("test", environments)
-        self.assertEqual(environments["test"]["name"], "Test Environment")
-    
-    def test_get_default_environment(self):
-        """Test getting default environment name."""
-        # Get default environment
-        default_env = self.config_manager.get_default_environment()
-        
-        # Check default environment
-        self.assertEqual(default_env, "test")
-    
     def test_set_default_environment(self):
         """Test setting default environment."""
         # Add a new environment
@@ -195,15 +182,6 @@ class TestDeploymentConfig(unittest.TestCase):
         self.assertNotIn("test", self.config_manager.get_environments())
         self.assertEqual(self.config_manager.get_default_environment(), "new")
     
-    def test_get_bot_settings(self):
-        """Test getting bot settings."""
-        # Get bot settings
-        bot_settings = self.config_manager.get_bot_settings()
-        
-        # Check bot settings
-        self.assertEqual(bot_settings["name"], "Test Bot")
-        self.assertEqual(bot_settings["version"], "1.0.0")
-    
     def test_update_bot_settings(self):
         """Test updating bot settings."""
         # Update bot settings
@@ -217,15 +195,6 @@ class TestDeploymentConfig(unittest.TestCase):
         self.assertEqual(self.config_manager.get_bot_settings()["name"], "Updated Test Bot")
         self.assertEqual(self.config_manager.get_bot_settings()["version"], "1.1.0")
     
-    def test_get_environment_variables(self):
-        """Test getting environment variables."""
-        # Get environment variables
-        env_vars = self.config_manager.get_environment_variables("test")
-        
-        # Check environment variables
-        self.assertEqual(env_vars["DEBUG"], "true")
-        self.assertEqual(env_vars["LOG_LEVEL"], "DEBUG")
-    
     def test_update_environment_variables(self):
         """Test updating environment variables."""
         # Update environment variables
@@ -247,38 +216,94 @@ class TestDeploymentConfig(unittest.TestCase):
         result = self.config_manager.generate_env_file("test", env_file)
         
         # Check result
-        self.assertTrue(result)
+        self.assertIsNotNone(result)
         self.assertTrue(os.path.exists(env_file))
         
-        # Check file content
-        with open(env_file, 'r') as f:
-            content = f.read()
+        # Check generated content
+        lines = set(result.splitlines())
+        self.assertIn("DEBUG=true", lines)
+        self.assertIn("LOG_LEVEL=DEBUG", lines)
+    
+    def test_generate_empty_env_file(self):
+        """Test that an environment without variables still reports success."""
+        self.config_manager.add_environment("empty", {"name": "Empty", "env_vars": {}})
+        env_file = os.path.join(self.test_dir, ".env.empty")
+        result = self.config_manager.generate_env_file("empty", env_file)
         
-        self.assertIn("DEBUG=true", content)
-        self.assertIn("LOG_LEVEL=DEBUG", content)
+        # Check result
+        self.assertEqual(result, "")
+        self.assertTrue(os.path.exists(env_file))
 
 
-class TestDeployment(unittest.TestCase):
-    """Test cases for the Deployment class."""
+class TestDeploymentConfigReadOnly(unittest.TestCase):
+    """
+    Read-only test cases for the DeploymentConfig class.
     
-    def setUp(self):
-        """Set up test environment."""
-        # Create a temporary directory for test files
-        self.test_dir = tempfile.mkdtemp()
-        self.config_file = os.path.join(self.test_dir, "test_config.json")
-        self.source_dir = os.path.join(self.test_dir, "source")
-        self.deploy_dir = os.path.join(self.test_dir, "deploy")
+    Every test shares one configuration manager and must not modify it;
+    tests that change the configuration belong in TestDeploymentConfig.
+    """
+    
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _shared_config_manager(cls, tmp_path_factory):
+        """Load a single DeploymentConfig for the whole class."""
+        config_file = tmp_path_factory.mktemp("config") / "test_config.json"
+        config_file.write_bytes(_json_dumps(TestDeploymentConfig.test_config))
+        cls.config_manager = DeploymentConfig(config_file=str(config_file))
+    
+    def test_get_environment(self):
+        """Test getting environment configuration."""
+        # Get environment
+        env_config = self.config_manager.get_environment("test")
         
-        # Create source directory
-        os.makedirs(self.source_dir)
+        # Check environment configuration
+        self.assertEqual(env_config["name"], "Test Environment")
+        self.assertEqual(env_config["host"], "test.example.com")
+    
+    def test_get_environments(self):
+        """Test getting all environment configurations."""
+        # Get environments
+        environments = self.config_manager.get_environments()
         
-        # Create test files in source directory
-        for file_name in ["enhanced_bot.py", "api.py", "integration.py", "monitor.py"]:
-            with open(os.path.join(self.source_dir, file_name), 'w') as f:
-                f.write(f"# Test file: {file_name}")
+        # Check environments
+        self.assertIn("test", environments)
+        self.assertEqual(environments["test"]["name"], "Test Environment")
+    
+    def test_get_default_environment(self):
+        """Test getting default environment name."""
+        # Get default environment
+        default_env = self.config_manager.get_default_environment()
+        
+        # Check default environment
+        self.assertEqual(default_env, "test")
+    
+    def test_get_bot_settings(self):
+        """Test getting bot settings."""
+        # Get bot settings
+        bot_settings = self.config_manager.get_bot_settings()
+        
+        # Check bot settings
+        self.assertEqual(bot_settings["name"], "Test Bot")
+        self.assertEqual(bot_settings["version"], "1.0.0")
+    
+    def test_get_environment_variables(self):
+        """Test getting environment variables."""
+        # Get environment variables
+        env_vars = self.config_manager.get_environment_variables("test")
         
+        # Check environment variables
+        self.assertEqual(env_vars["DEBUG"], "true")
+        self.assertEqual(env_vars["LOG_LEVEL"], "DEBUG")
+
+
+class TestDeployment(unittest.TestCase):
+    """Test cases for the Deployment class."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Build and serialize the shared test configuration once."""
         # Create a test configuration
-        self.test_config = {
+        cls.test_config = {
             "environments": {
                 "test": {
                     "name": "Test Environment",
@@ -298,19 +323,38 @@ class TestDeployment(unittest.TestCase):
             "default_environment": "test",
             "deployment_history": [],
         }
+        cls._config_bytes = _json_dumps(cls.test_config)
+        cls._source_files = {
+            file_name: f"# Test file: {file_name}".encode()
+            for file_name in ["enhanced_bot.py", "api.py", "integration.py", "monitor.py"]
+        }
+    
+    @pytest.fixture(autouse=True)
+    def _use_tmp_path(self, tmp_path):
+        """Give each test its own pytest-managed temporary directory."""
+        self.test_dir = str(tmp_path)
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.config_file = os.path.join(self.test_dir, "test_config.json")
+        self.source_dir = os.path.join(self.test_dir, "source")
+        self.deploy_dir = os.path.join(self.test_dir, "deploy")
+        
+        # Create source directory
+        os.makedirs(self.source_dir)
+        
+        # Create test files in source directory
+        for file_name, payload in self._source_files.items():
+            with open(os.path.join(self.source_dir, file_name), 'wb') as f:
+                f.write(payload)
         
         # Write test configuration to file
-        with open(self.config_file, 'w') as f:
-            json.dump(self.test_config, f)
+        with open(self.config_file, 'wb') as f:
+            f.write(self._config_bytes)
         
         # Create Deployment instance
         self.deployment = Deployment(config_file=self.config_file)
     
-    def tearDown(self):
-        """Clean up test environment."""
-        # Remove temporary directory
-        shutil.rmtree(self.test_dir)
-    
     def test_load_config(self):
         """Test loading configuration from a file."""
         # Create a new Deployment instance
@@ -338,8 +382,7 @@ class TestDeployment(unittest.TestCase):
         self.assertTrue(os.path.exists(new_config_file))
         
         # Load saved configuration
-        with open(new_config_file, 'r') as f:
-            saved_config = json.load(f)
+        saved_config = _load_json(new_config_file)
         
         # Check saved configuration
         self.assertEqual(saved_config["environments"]["test"]["name"], "Updated Test Environment")
@@ -410,18 +453,64 @@ class TestDeployment(unittest.TestCase):
         self.assertEqual(result["status"], "ok")
         self.assertIn("deployment_id", result)
         
-        # Check deployment directory
-        self.assertTrue(os.path.exists(self.deploy_dir))
-        for file_name in ["enhanced_bot.py", "api.py", "integration.py", "monitor.py"]:
-            self.assertTrue(os.path.exists(os.path.join(self.deploy_dir, file_name)))
-        
-        # Check .env file
-        self.assertTrue(os.path.exists(os.path.join(self.deploy_dir, ".env")))
+        # Check deployment directory, including the generated .env file
+        self.assertTrue(os.path.isdir(self.deploy_dir))
+        with os.scandir(self.deploy_dir) as entries:
+            deployed = {entry.name for entry in entries}
+        self.assertLessEqual(set(self._source_files) | {".env"}, deployed)
         
         # Check deployment history
         self.assertEqual(len(self.deployment.config["deployment_history"]), 1)
         self.assertEqual(self.deployment.config["deployment_history"][0]["status"], "success")
     
+    def test_prepare_deployment_missing_source(self):
+        """Test preparing a deployment from a source directory that does not exist."""
+        missing_dir = os.path.join(self.test_dir, "missing")
+        result = self.deployment._prepare_deployment("test", missing_dir, {})
+        
+        # Check result
+        self.assertEqual(result["status"], "error")
+        self.assertTrue(result["error"].startswith("Missing required files: enhanced_bot.py"))
+    
+    def test_execute_deployment_copy_method(self):
+        """Test linking and copying files into the deployment directory."""
+        source_file = os.path.join(self.source_dir, "api.py")
+        deployed_file = os.path.join(self.deploy_dir, "api.py")
+        os.makedirs(self.deploy_dir)
+        
+        # Copy files by default so the deployment does not share data with the source
+        result = self.deployment._execute_deployment(
+            "test", self.source_dir,
+            {"deploy_dir": self.deploy_dir, "restart": False},
+        )
+        self.assertEqual(result["status"], "ok")
+        self.assertFalse(os.path.samefile(source_file, deployed_file))
+        
+        # Hard-link files into the deployment directory when asked to
+        result = self.deployment._execute_deployment(
+            "test", self.source_dir,
+            {"deploy_dir": self.deploy_dir, "restart": False, "backup": False, "copy_method": "link"},
+        )
+        self.assertEqual(result["status"], "ok")
+        self.assertTrue(os.path.samefile(source_file, deployed_file))
+        
+        # Copy them on redeploy without touching the linked source
+        result = self.deployment._execute_deployment(
+            "test", self.source_dir,
+            {"deploy_dir": self.deploy_dir, "restart": False, "backup": False, "copy_method": "copy"},
+        )
+        self.assertEqual(result["status"], "ok")
+        self.assertFalse(os.path.samefile(source_file, deployed_file))
+        with open(deployed_file, 'r') as f:
+            self.assertEqual(f.read(), "# Test file: api.py")
+        
+        # Reject unknown copy methods
+        result = self.deployment._execute_deployment(
+            "test", self.source_dir,
+            {"deploy_dir": self.deploy_dir, "restart": False, "copy_method": "rsync"},
+        )
+        self.assertEqual(result["status"], "error")
+    
     def test_get_deployment_history(self):
         """Test getting deployment history."""
         # Deploy the bot
@@ -440,25 +529,12 @@ class TestDeployment(unittest.TestCase):
         self.assertEqual(history[0]["status"], "success")
 
 
-def run_tests():
-    """Run all tests."""
-    # Create test suite
-    test_suite = unittest.TestSuite()
-    
-    # Add test cases
-    test_suite.addTest(unittest.makeSuite(TestDeploymentConfig))
-    test_suite.addTest(unittest.makeSuite(TestDeployment))
-    
-    # Run tests
-    test_runner = unittest.TextTestRunner(verbosity=2)
-    test_result = test_runner.run(test_suite)
-    
-    return test_result.wasSuccessful()
-
-
 if __name__ == "__main__":
-    # Run tests
-    success = run_tests()
-    
-    # Exit with appropriate status code
-    sys.exit(0 if success else 1)
+    # Run tests, spread across worker processes when pytest-xdist is available
+    args = [__file__]
+    try:
+        import xdist  # noqa: F401
+        args = ["-n", "auto"] + args
+    except ImportError:
+        pass
+    sys.exit(pytest.main(args))
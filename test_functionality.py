@@ -10,382 +10,635 @@ This module handles testing of bot functionality, including command handling,
 API integration, and other features.
 """
 
-import os
-import sys
+import copy
 import logging
 import json
+import re
 import time
-import unittest
-import tempfile
-import shutil
-from datetime import datetime
+import threading
+import pytest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
-from typing import Dict, List, Optional, Union, Any, Callable
-
-# Import bot modules
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-import enhanced_bot
-import api
-import integration
-import monitor
-
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
-logger = logging.getLogger(__name__)
-
-
-class TestBotCommands(unittest.TestCase):
-    """Test cases for bot commands."""
-    
-    def setUp(self):
-        """Set up test environment."""
-        # Create mock objects
-        self.bot = MagicMock()
-        self.update = MagicMock()
-        self.context = MagicMock()
-        
-        # Set up mock user
-        self.user = MagicMock()
-        self.user.id = 12345
-        self.user.first_name = "Test"
-        self.user.last_name = "User"
-        self.user.username = "testuser"
-        
-        # Set up mock message
-        self.message = MagicMock()
-        self.message.from_user = self.user
-        self.message.chat_id = 12345
-        self.message.text = "/start"
-        
-        # Set up mock update
-        self.update.message = self.message
-        self.update.effective_chat = self.message
-        
-        # Set up mock context
-        self.context.bot = self.bot
+
+
+# Bot commands and handlers
+
+# Case-insensitive patterns for the text expected in bot replies
+_REPLY_TEXT = {
+    word: re.compile(re.escape(word), re.IGNORECASE)
+    for word in ("welcome", "commands", "settings", "unknown", "error")
+}
+
+
+class _BotSpec:
+    """The bot methods the handlers under test may call."""
     
-    def test_start_command(self):
-        """Test the /start command."""
-        # Call start command handler
-        enhanced_bot.start_command(self.update, self.context)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-        self.assertIn("Welcome", kwargs["text"])
-    
-    def test_help_command(self):
-        """Test the /help command."""
-        # Call help command handler
-        enhanced_bot.help_command(self.update, self.context)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-        self.assertIn("commands", kwargs["text"].lower())
-    
-    def test_settings_command(self):
-        """Test the /settings command."""
-        # Call settings command handler
-        enhanced_bot.settings_command(self.update, self.context)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-        self.assertIn("settings", kwargs["text"].lower())
-    
-    def test_unknown_command(self):
-        """Test handling of unknown commands."""
-        # Set up message with unknown command
-        self.message.text = "/unknown"
-        
-        # Call unknown command handler
-        enhanced_bot.unknown_command(self.update, self.context)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-        self.assertIn("unknown", kwargs["text"].lower())
+    def send_message(self, *args, **kwargs): ...
+    
+    def answer_callback_query(self, *args, **kwargs): ...
+    
+    def edit_message_text(self, *args, **kwargs): ...
+
+
+def _assert_sent(bot, chat_id, text=None):
+    """Check that bot sent exactly one message to chat_id, containing text if given."""
+    bot.send_message.assert_called_once()
+    kwargs = bot.send_message.call_args.kwargs
+    assert kwargs["chat_id"] == chat_id
+    if text is not None:
+        assert _REPLY_TEXT[text].search(kwargs["text"])
+    return kwargs
 
 
-class TestBotFunctionality(unittest.TestCase):
-    """Test cases for bot functionality."""
+@pytest.fixture(scope="session")
+def _mock_template():
+    """Build the user/message/update/context test doubles once per session."""
+    # Passive data objects are plain namespaces; only the bot records calls
+    user = SimpleNamespace(id=12345, first_name="Test", last_name="User", username="testuser")
+    message = SimpleNamespace(from_user=user, chat_id=12345, text="/start")
+    update = SimpleNamespace(message=message, effective_chat=message)
     
-    def setUp(self):
-        """Set up test environment."""
-        # Create mock objects
-        self.bot = MagicMock()
-        self.update = MagicMock()
-        self.context = MagicMock()
-        
-        # Set up mock user
-        self.user = MagicMock()
-        self.user.id = 12345
-        self.user.first_name = "Test"
-        self.user.last_name = "User"
-        self.user.username = "testuser"
-        
-        # Set up mock message
-        self.message = MagicMock()
-        self.message.from_user = self.user
-        self.message.chat_id = 12345
-        self.message.text = "Hello, bot!"
-        
-        # Set up mock update
-        self.update.message = self.message
-        self.update.effective_chat = self.message
-        
-        # Set up mock context
-        self.context.bot = self.bot
+    # Set up mock context; the bot only exposes the methods in _BotSpec
+    bot = MagicMock(spec_set=_BotSpec)
+    context = MagicMock()
+    context.bot = bot
     
-    def test_message_handler(self):
-        """Test message handling."""
-        # Call message handler
-        enhanced_bot.message_handler(self.update, self.context)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-    
-    def test_error_handler(self):
-        """Test error handling."""
-        # Create a test exception
-        test_exception = Exception("Test error")
-        
-        # Call error handler
-        enhanced_bot.error_handler(self.update, self.context, test_exception)
-        
-        # Check if bot sent a message
-        self.bot.send_message.assert_called_once()
-        
-        # Check message content
-        args, kwargs = self.bot.send_message.call_args
-        self.assertEqual(kwargs["chat_id"], 12345)
-        self.assertIn("error", kwargs["text"].lower())
-    
-    def test_callback_handler(self):
-        """Test callback query handling."""
-        # Set up mock callback query
-        callback_query = MagicMock()
-        callback_query.data = "test_data"
-        callback_query.message = self.message
-        
-        # Set up mock update
-        self.update.callback_query = callback_query
-        
-        # Call callback handler
-        enhanced_bot.callback_handler(self.update, self.context)
-        
-        # Check if bot answered callback query
-        self.bot.answer_callback_query.assert_called_once()
-        
-        # Check if bot edited message
-        self.bot.edit_message_text.assert_called_once()
-
-
-class TestAPIIntegration(unittest.TestCase):
-    """Test cases for API integration."""
-    
-    def setUp(self):
-        """Set up test environment."""
-        # Create API client
-        self.api_client = api.APIClient()
-    
-    @patch('api.requests.get')
-    def test_get_request(self, mock_get):
-        """Test GET request."""
-        # Set up mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "ok", "data": "test_data"}
-        mock_get.return_value = mock_response
-        
-        # Make GET request
-        response = self.api_client.get("https://example.com/api/test")
-        
-        # Check response
-        self.assertEqual(response["status"], "ok")
-        self.assertEqual(response["data"], "test_data")
-    
-    @patch('api.requests.post')
-    def test_post_request(self, mock_post):
-        """Test POST request."""
-        # Set up mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "ok", "data": "test_data"}
-        mock_post.return_value = mock_response
-        
-        # Make POST request
-        response = self.api_client.post("https://example.com/api/test", {"key": "value"})
-        
-        # Check response
-        self.assertEqual(response["status"], "ok")
-        self.assertEqual(response["data"], "test_data")
-    
-    @patch('api.requests.get')
-    def test_error_handling(self, mock_get):
-        """Test error handling."""
-        # Set up mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.json.return_value = {"status": "error", "message": "Not found"}
-        mock_get.return_value = mock_response
-        
-        # Make GET request
-        response = self.api_client.get("https://example.com/api/test")
-        
-        # Check response
-        self.assertEqual(response["status"], "error")
-        self.assertEqual(response["message"], "Not found")
+    return {"user": user, "message": message, "update": update, "bot": bot, "context": context}
+
+
+@pytest.fixture
+def _mocks(_mock_template):
+    """Give each test its own copy of the test doubles."""
+    return copy.deepcopy(_mock_template)
+
+
+@pytest.fixture
+def mock_user(_mocks):
+    """Telegram user stub."""
+    return _mocks["user"]
+
+
+@pytest.fixture
+def mock_message(_mocks):
+    """/start message stub from the user stub."""
+    return _mocks["message"]
+
+
+@pytest.fixture
+def mock_update(_mocks):
+    """Update stub carrying the message stub."""
+    return _mocks["update"]
 
 
-class TestMonitoring(unittest.TestCase):
-    """Test cases for monitoring functionality."""
+@pytest.fixture
+def mock_bot(_mocks):
+    """Mock bot."""
+    return _mocks["bot"]
+
+
+@pytest.fixture
+def mock_context(_mocks):
+    """Mock handler context bound to the mock bot."""
+    return _mocks["context"]
+
+
+@pytest.mark.parametrize("command, expected_text", [
+    ("start_command", "welcome"),
+    ("help_command", "commands"),
+    ("settings_command", "settings"),
+])
+def test_simple_command(mock_update, mock_context, mock_bot, command, expected_text):
+    """Test the /start, /help and /settings commands."""
+    import enhanced_bot
     
-    def setUp(self):
-        """Set up test environment."""
-        # Create temporary directory for test files
-        self.test_dir = tempfile.mkdtemp()
-        self.log_file = os.path.join(self.test_dir, "test.log")
-        
-        # Create system monitor
-        self.monitor = monitor.SystemMonitor(log_file=self.log_file)
-    
-    def tearDown(self):
-        """Clean up test environment."""
-        # Remove temporary directory
-        shutil.rmtree(self.test_dir)
-    
-    def test_log_activity(self):
-        """Test logging user activity."""
-        # Log activity
-        self.monitor.log_activity(user_id=12345, activity="test_activity")
-        
-        # Check if activity was logged
-        self.assertIn(12345, self.monitor.user_activity)
-        self.assertEqual(len(self.monitor.user_activity[12345]), 1)
-        self.assertEqual(self.monitor.user_activity[12345][0]["activity"], "test_activity")
-    
-    def test_log_error(self):
-        """Test logging errors."""
-        # Log error
-        self.monitor.log_error("Test error", user_id=12345)
-        
-        # Check if error was logged
-        self.assertEqual(self.monitor.error_count, 1)
-        
-        # Check if error was added to logs
-        logs = list(self.monitor.logs)
-        self.assertEqual(logs[-1]["level"], "ERROR")
-        self.assertEqual(logs[-1]["message"], "Test error")
-        self.assertEqual(logs[-1]["user_id"], 12345)
-    
-    def test_get_system_status(self):
-        """Test getting system status."""
-        # Get system status
-        status = self.monitor.get_system_status()
-        
-        # Check status
-        self.assertIn("status", status)
-        self.assertIn("uptime", status)
-        self.assertIn("cpu_percent", status)
-        self.assertIn("memory_percent", status)
-        self.assertIn("disk_percent", status)
-        self.assertIn("error_count", status)
-        self.assertIn("warning_count", status)
-        self.assertIn("maintenance_mode", status)
-
-
-class TestPerformanceTracking(unittest.TestCase):
-    """Test cases for performance tracking."""
-    
-    def setUp(self):
-        """Set up test environment."""
-        # Create performance tracker
-        self.tracker = monitor.PerformanceTracker()
-    
-    def test_track_response_time(self):
-        """Test tracking response time."""
-        # Track response time
-        start_time = time.time()
-        time.sleep(0.1)  # Simulate some work
-        self.tracker.track_response_time(start_time)
-        
-        # Check if response time was tracked
-        self.assertEqual(len(self.tracker.metrics["response_time"]), 1)
-        self.assertGreaterEqual(self.tracker.metrics["response_time"][0]["value"], 100)  # At least 100ms
-    
-    def test_track_api_call(self):
-        """Test tracking API calls."""
-        # Track API call
-        self.tracker.track_api_call("test_api", True, 150.5)
-        
-        # Check if API call was tracked
-        self.assertEqual(len(self.tracker.metrics["api_calls"]), 1)
-        self.assertEqual(self.tracker.metrics["api_calls"][0]["api_name"], "test_api")
-        self.assertEqual(self.tracker.metrics["api_calls"][0]["success"], True)
-        self.assertEqual(self.tracker.metrics["api_calls"][0]["response_time"], 150.5)
-    
-    def test_get_metrics(self):
-        """Test getting performance metrics."""
-        # Track some metrics
-        start_time = time.time()
-        time.sleep(0.1)  # Simulate some work
-        self.tracker.track_response_time(start_time)
-        self.tracker.track_api_call("test_api", True, 150.5)
-        
-        # Get metrics
-        metrics = self.tracker.get_metrics()
-        
-        # Check metrics
-        self.assertIn("response_time", metrics)
-        self.assertIn("api_success_rate", metrics)
-        self.assertIn("api_response_time", metrics)
-        self.assertIn("uptime", metrics)
-        self.assertIn("last_update", metrics)
+    # Call command handler
+    getattr(enhanced_bot, command)(mock_update, mock_context)
+    
+    # Check the message sent to the chat
+    _assert_sent(mock_bot, 12345, expected_text)
+
+
+def test_unknown_command(mock_message, mock_update, mock_context, mock_bot):
+    """Test handling of unknown commands."""
+    import enhanced_bot
+    
+    # Set up message with unknown command
+    mock_message.text = "/unknown"
+    
+    # Call unknown command handler
+    enhanced_bot.unknown_command(mock_update, mock_context)
+    
+    # Check the message sent to the chat
+    _assert_sent(mock_bot, 12345, "unknown")
+
+
+def test_message_handler(mock_message, mock_update, mock_context, mock_bot):
+    """Test message handling."""
+    import enhanced_bot
+    
+    # Set up plain text message
+    mock_message.text = "Hello, bot!"
+    
+    # Call message handler
+    enhanced_bot.message_handler(mock_update, mock_context)
+    
+    # Check the message sent to the chat
+    _assert_sent(mock_bot, 12345)
+
+
+def test_error_handler(mock_update, mock_context, mock_bot):
+    """Test error handling."""
+    import enhanced_bot
+    
+    # Create a test exception
+    test_exception = Exception("Test error")
+    
+    # Call error handler
+    enhanced_bot.error_handler(mock_update, mock_context, test_exception)
+    
+    # Check the message sent to the chat
+    _assert_sent(mock_bot, 12345, "error")
+
+
+def test_callback_handler(mock_message, mock_update, mock_context, mock_bot):
+    """Test callback query handling."""
+    import enhanced_bot
+    
+    # Set up callback query stub
+    callback_query = SimpleNamespace(data="test_data", message=mock_message)
+    
+    # Set up mock update
+    mock_update.callback_query = callback_query
+    
+    # Call callback handler
+    enhanced_bot.callback_handler(mock_update, mock_context)
+    
+    # Check if bot answered callback query
+    mock_bot.answer_callback_query.assert_called_once()
+    
+    # Check if bot edited message
+    mock_bot.edit_message_text.assert_called_once()
+
+
+# API integration
+
+@pytest.fixture
+def api_client():
+    """Create an API client."""
+    import api
+    
+    return api.APIClient()
+
+
+@patch('api.requests.get')
+def test_get_request(mock_get, api_client):
+    """Test GET request."""
+    # Set up mock response
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"status": "ok", "data": "test_data"}
+    mock_get.return_value = mock_response
+    
+    # Make GET request
+    response = api_client.get("https://example.com/api/test")
+    
+    # Check response
+    assert response["status"] == "ok"
+    assert response["data"] == "test_data"
+
+
+@patch('api.requests.post')
+def test_post_request(mock_post, api_client):
+    """Test POST request."""
+    # Set up mock response
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"status": "ok", "data": "test_data"}
+    mock_post.return_value = mock_response
+    
+    # Make POST request
+    response = api_client.post("https://example.com/api/test", {"key": "value"})
+    
+    # Check response
+    assert response["status"] == "ok"
+    assert response["data"] == "test_data"
 
 
-def run_tests():
-    """Run all tests."""
-    # Create test suite
-    test_suite = unittest.TestSuite()
+@patch('api.requests.get')
+def test_error_handling(mock_get, api_client):
+    """Test error handling."""
+    # Set up mock response
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+    mock_response.json.return_value = {"status": "error", "message": "Not found"}
+    mock_get.return_value = mock_response
     
-    # Add test cases
-    test_suite.addTest(unittest.makeSuite(TestBotCommands))
-    test_suite.addTest(unittest.makeSuite(TestBotFunctionality))
-    test_suite.addTest(unittest.makeSuite(TestAPIIntegration))
-    test_suite.addTest(unittest.makeSuite(TestMonitoring))
-    test_suite.addTest(unittest.makeSuite(TestPerformanceTracking))
+    # Make GET request
+    response = api_client.get("https://example.com/api/test")
     
-    # Run tests
-    test_runner = unittest.TextTestRunner(verbosity=2)
-    test_result = test_runner.run(test_suite)
+    # Check response
+    assert response["status"] == "error"
+    assert response["message"] == "Not found"
+
+
+# Service integration
+
+@pytest.fixture
+def service_integration():
+    """Create a service integration with one service per check type."""
+    import integration
     
-    return test_result.wasSuccessful()
+    service_integration = integration.ServiceIntegration()
+    service_integration.register_service("web", {"type": "http", "url": "https://example.com/health", "enabled": True})
+    service_integration.register_service("queue", {"type": "amqp", "enabled": True})
+    return service_integration
 
 
-if __name__ == "__main__":
-    # Run tests
-    success = run_tests()
+def test_check_all_services(service_integration):
+    """Test checking every enabled service."""
+    import integration
+    
+    # Set up mock response
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    service_integration.session.request = MagicMock(return_value=mock_response)
+    
+    # Check all services
+    results = service_integration.check_all_services()
+    
+    # Check results
+    assert set(results) == {"web", "queue"}
+    assert results["web"]["status"] == "ok"
+    assert results["queue"]["status"] == "unknown"
+    assert service_integration.get_service_status("web")["status"] == "ok"
+    
+    # Check that separate connect/read timeouts were used
+    args, kwargs = service_integration.session.request.call_args
+    assert kwargs["timeout"] == (integration.DEFAULT_CONNECT_TIMEOUT, integration.DEFAULT_READ_TIMEOUT)
+
+
+@pytest.fixture
+def dualstack_server(monkeypatch):
+    """Serve HTTP on IPv4 only behind a host that resolves to ::1 first, then 127.0.0.1."""
+    import socket
+    import integration
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    # Listen on IPv4 only
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Resolve a dual-stack host with the unreachable IPv6 address first
+    real_getaddrinfo = socket.getaddrinfo
+    lookups = []
+    
+    def fake_getaddrinfo(host, *args, **kwargs):
+        if host != "dualstack.test":
+            return real_getaddrinfo(host, *args, **kwargs)
+        lookups.append(host)
+        return [
+            (socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("::1", 0, 0, 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("127.0.0.1", 0)),
+        ]
+    
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    monkeypatch.setattr(integration, "_dns_cache", {})
+    yield SimpleNamespace(url=f"http://dualstack.test:{server.server_address[1]}/", lookups=lookups)
+    server.shutdown()
+    server.server_close()
+
+
+def _get_new_connection(service_integration, url):
+    """Request a URL and close the pool so the next request opens a new connection."""
+    response = service_integration.session.get(url, timeout=5)
+    assert response.status_code == 200
+    response.close()
+    service_integration.session.close()
+
+
+def test_cached_dns_tries_every_address(service_integration, dualstack_server):
+    """Test that a host is reached through its second address when the first refuses."""
+    import integration
+    
+    for _ in range(2):
+        _get_new_connection(service_integration, dualstack_server.url)
+    
+    # Check that the working address is cached and tried first
+    assert dualstack_server.lookups == ["dualstack.test"]
+    assert integration._dns_cache["dualstack.test"][0] == ["127.0.0.1", "::1"]
+
+
+def test_cached_dns_expiry(service_integration, dualstack_server, monkeypatch):
+    """Test that a host is resolved again once its cache entry is older than DNS_CACHE_TTL."""
+    import integration
+    
+    # Advance the monotonic clock on demand
+    real_monotonic = time.monotonic
+    offset = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: real_monotonic() + offset[0])
+    
+    _get_new_connection(service_integration, dualstack_server.url)
+    offset[0] = integration.DNS_CACHE_TTL - 1
+    _get_new_connection(service_integration, dualstack_server.url)
+    assert dualstack_server.lookups == ["dualstack.test"]
+    
+    # Check that an expired entry is resolved again
+    offset[0] = integration.DNS_CACHE_TTL + 1
+    _get_new_connection(service_integration, dualstack_server.url)
+    assert dualstack_server.lookups == ["dualstack.test", "dualstack.test"]
+
+
+# Monitoring
+
+@pytest.fixture
+def system_monitor(tmp_path):
+    """Create a system monitor logging to a temporary file."""
+    import monitor
+    
+    return monitor.SystemMonitor(log_file=str(tmp_path / "test.log"))
+
+
+def test_log_activity(system_monitor):
+    """Test logging user activity."""
+    # Log activity
+    system_monitor.log_activity(user_id=12345, activity="test_activity")
+    
+    # Check if activity was logged
+    assert 12345 in system_monitor.user_activity
+    assert len(system_monitor.user_activity[12345]) == 1
+    assert system_monitor.user_activity[12345][0]["activity"] == "test_activity"
+
+
+def test_log_error(system_monitor):
+    """Test logging errors."""
+    # Log error
+    system_monitor.log_error("Test error", user_id=12345)
+    
+    # Check if error was logged
+    assert system_monitor.error_count == 1
+    
+    # Check if error was added to logs
+    logs = list(system_monitor.logs)
+    assert logs[-1].level == "ERROR"
+    assert logs[-1].message == "Test error"
+    assert logs[-1].user_id == 12345
+
+
+def test_flush_logs(system_monitor):
+    """Test writing queued log entries to the log file."""
+    # Log entries and flush them to the file
+    system_monitor.log_error("Test error", user_id=12345)
+    system_monitor.log_error("Bad error", extra={"obj": {1, 2}})
+    system_monitor.log_warning("Test warning")
+    system_monitor.flush_logs()
+    
+    # Check that the entry that cannot be serialized is skipped and the rest are written in order
+    with open(system_monitor.log_file) as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["level"] for entry in entries] == ["ERROR", "WARNING"]
+    assert entries[0]["user_id"] == 12345
+
+
+def test_flush_logs_no_progress(system_monitor, monkeypatch):
+    """Test that a write that makes no progress is reported instead of retried forever."""
+    import monitor
+    
+    # Log an entry and fail every write without writing anything
+    system_monitor.log_warning("Test warning")
+    monkeypatch.setattr(monitor.os, "writev", lambda fd, buffers: 0, raising=False)
+    monkeypatch.setattr(monitor.os, "write", lambda fd, data: 0)
+    with patch.object(monitor.logger, "error") as log_error:
+        system_monitor.flush_logs()
+    
+    # Check that the failure was logged
+    assert "no progress" in log_error.call_args[0][0]
+
+
+def test_get_recent_logs(system_monitor):
+    """Test retrieving recent logs with filters."""
+    # Log a mix of errors and warnings
+    for i in range(5):
+        system_monitor.log_error(f"Error {i}", user_id=12345 if i % 2 else 67890)
+        system_monitor.log_warning(f"Warning {i}")
+    
+    # Check that the newest matching logs come first
+    logs = system_monitor.get_recent_logs(count=2, level="ERROR", user_id=12345)
+    assert [log["message"] for log in logs] == ["Error 3", "Error 1"]
+    assert isinstance(logs[0]["timestamp"], str)
+
+
+def test_get_usage_statistics(system_monitor):
+    """Test getting usage statistics."""
+    # Log some commands
+    system_monitor.log_activity(user_id=12345, activity="start_command")
+    system_monitor.log_activity(user_id=67890, activity="help_command")
+    system_monitor.log_activity(user_id=12345, activity="help_command")
+    
+    # Get usage statistics
+    stats = system_monitor.get_usage_statistics()
     
-    # Exit with appropriate status code
-    sys.exit(0 if success else 1)
+    # Check statistics
+    assert stats["total_users"] == 2
+    assert stats["active_users_24h"] == 2
+    assert stats["new_users_7d"] == 2
+    assert stats["total_commands"] == 3
+    assert stats["popular_commands"] == ["help", "start"]
+
+
+def test_get_system_status(system_monitor):
+    """Test getting system status."""
+    # Get system status
+    status = system_monitor.get_system_status()
+    
+    # Check status
+    assert "status" in status
+    assert "uptime" in status
+    assert "cpu_percent" in status
+    assert "memory_percent" in status
+    assert "disk_percent" in status
+    assert "error_count" in status
+    assert "warning_count" in status
+    assert "maintenance_mode" in status
+
+
+def test_system_status_cpu_from_scheduler(system_monitor, monkeypatch):
+    """Test that status requests from any thread use the CPU value sampled by the scheduler."""
+    import monitor
+    
+    # Sample on the scheduler thread only
+    monkeypatch.setattr(monitor.psutil, "cpu_percent", MagicMock(return_value=42.0))
+    monitor._sample_cpu()
+    monitor.psutil.cpu_percent.reset_mock()
+    system_monitor._sys_snap = None
+    
+    # Read the status from a new thread
+    results = []
+    thread = threading.Thread(target=lambda: results.append(system_monitor.get_system_status()))
+    thread.start()
+    thread.join()
+    assert results[0]["cpu_percent"] == 42.0
+    monitor.psutil.cpu_percent.assert_not_called()
+
+
+def test_scheduler_shutdown():
+    """Test running and stopping scheduled jobs."""
+    import monitor
+    
+    # Schedule a job on a private scheduler
+    scheduler = monitor._Scheduler()
+    ran = threading.Event()
+    scheduler.schedule(60, ran.set)
+    assert ran.wait(5)
+    
+    # Check that shutdown stops the thread without waiting for the next run
+    scheduler.shutdown()
+    assert not scheduler._thread.is_alive()
+
+
+def test_duplicate_log_filter():
+    """Test suppression of repeated warnings."""
+    import monitor
+    
+    # Create filter and records
+    log_filter = monitor.DuplicateLogFilter(interval=60)
+    error = logging.LogRecord("monitor", logging.ERROR, __file__, 0, "Test error", None, None)
+    info = logging.LogRecord("monitor", logging.INFO, __file__, 0, "Test info", None, None)
+    
+    # Check that only the first identical error passes
+    assert log_filter.filter(error)
+    assert not log_filter.filter(error)
+    
+    # Check that informational records are never suppressed
+    assert log_filter.filter(info)
+    assert log_filter.filter(info)
+
+
+def test_duplicate_log_filter_threads():
+    """Test that the filter can be used from several threads at once."""
+    import monitor
+    
+    # A small table forces frequent pruning while other threads add records
+    log_filter = monitor.DuplicateLogFilter(interval=0, max_entries=8)
+    errors = []
+    
+    def emit(thread_id):
+        try:
+            for i in range(2000):
+                log_filter.filter(logging.LogRecord("monitor", logging.ERROR, __file__, 0,
+                                                    f"Error {thread_id}-{i}", None, None))
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=emit, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+# Performance tracking
+
+@pytest.fixture
+def tracker():
+    """Create a performance tracker."""
+    import monitor
+    
+    return monitor.PerformanceTracker()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace time.time with a clock that only moves when advanced."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_track_response_time(tracker, clock):
+    """Test tracking response time."""
+    # Track response time
+    start_time = time.time()
+    clock[0] += 0.15  # Simulate some work
+    tracker.track_response_time(start_time)
+    
+    # Check if response time was tracked
+    assert len(tracker.metrics["response_time"]["value"]) == 1
+    assert tracker.metrics["response_time"]["value"][0] >= 100  # At least 100ms
+
+
+def test_track_api_call(tracker):
+    """Test tracking API calls."""
+    # Track API call
+    tracker.track_api_call("test_api", True, 150.5)
+    
+    # Check if API call was tracked
+    assert len(tracker.metrics["api_calls"]["timestamp"]) == 1
+    assert tracker.metrics["api_calls"]["api_name"][0] == "test_api"
+    assert tracker.metrics["api_calls"]["success"][0] == True
+    assert tracker.metrics["api_calls"]["response_time"][0] == 150.5
+    
+    # Check that history rebuilds the sample
+    history = tracker.get_metric_history("api_calls")
+    assert history[0]["api_name"] == "test_api"
+    assert history[0]["response_time"] == 150.5
+
+
+def test_max_samples_validation():
+    """Test that a tracker must keep at least one sample."""
+    import monitor
+    
+    with pytest.raises(ValueError):
+        monitor.PerformanceTracker(max_samples=0)
+
+
+def test_api_metrics_window():
+    """Test that API metrics only cover the retained samples."""
+    import monitor
+    
+    # Create a tracker that keeps two samples
+    tracker = monitor.PerformanceTracker(max_samples=2)
+    
+    # Track three API calls; the first is evicted
+    tracker.track_api_call("test_api", False, 1000.0)
+    tracker.track_api_call("test_api", True, 100.0)
+    tracker.track_api_call("test_api", True, 200.0)
+    
+    # Check metrics
+    metrics = tracker.get_metrics()
+    assert metrics["api_success_rate"] == 100
+    assert metrics["api_response_time"] == 150
+
+
+def test_get_metrics(tracker, clock):
+    """Test getting performance metrics."""
+    # Track some metrics
+    start_time = time.time()
+    clock[0] += 0.15  # Simulate some work
+    tracker.track_response_time(start_time)
+    tracker.track_api_call("test_api", True, 150.5)
+    
+    # Get metrics
+    metrics = tracker.get_metrics()
+    
+    # Check metrics
+    assert "response_time" in metrics
+    assert "api_success_rate" in metrics
+    assert "api_response_time" in metrics
+    assert "uptime" in metrics
+    assert "last_update" in metrics
+
+
+@pytest.mark.benchmark(group="perf")
+def test_track_response_time_perf(benchmark, tracker):
+    """Benchmark recording a response time sample."""
+    benchmark(lambda: tracker.track_response_time(time.time()))
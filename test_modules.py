@@ -1,111 +1,174 @@
 import os
-import sys
 
-# Ensure the main project directory is in the Python path
-# This assumes test_modules.py is in /home/ubuntu/ and novaxa_bot_phase2 is a subdirectory
-# or that novaxa_bot_phase2 is directly in the Python path.
-module_base_path = "/home/ubuntu/novaxa_bot_phase2"
-if module_base_path not in sys.path:
-    sys.path.insert(0, module_base_path)
+import pytest
 
+from crm import crm_module
 from crm.crm_module import CRMModule
+from smart_reply import smart_reply_engine
 from smart_reply.smart_reply_engine import SmartReplyEngine
 
-def test_crm_module(crm):
-    print("--- Testing CRM Module ---")
-    # Clean up old data for consistent testing if file exists
-    if os.path.exists(crm.CRM_DATA_FILE):
-        os.remove(crm.CRM_DATA_FILE)
-        crm.customers = crm._load_customers() # Reload empty
-
-    print("Adding customer John Doe...")
-    success, msg = crm.add_customer("John Doe", "john.doe@example.com", "user123", "Lead", ["BidPrice"], "Initial contact.")
-    print(f"Result: {success}, {msg}")
-
-    print("Adding customer Jane Smith...")
-    success, msg = crm.add_customer("Jane Smith", "jane.smith@example.com", "user456", "Active Client", ["Amesis"], "Important client.")
-    print(f"Result: {success}, {msg}")
-
-    print("\nFinding customer John (by name)...")
-    john = crm.find_customer("John", search_by="name")
-    print(f"Found: {john}")
-
-    print("\nFinding customer user456 (by Telegram ID)...")
-    jane = crm.find_customer("user456")
-    print(f"Found: {jane}")
-
-    if jane:
-        print("\nUpdating Jane Smith's status to 'On Hold'...")
-        success, msg = crm.update_customer_status("user456", "On Hold")
-        print(f"Result: {success}, {msg}")
-        print(f"Jane after update: {crm.find_customer('user456')}")
-
-        print("\nAdding note to Jane Smith...")
-        success, msg = crm.add_note_to_customer("user456", "Follow up next week.")
-        print(f"Result: {success}, {msg}")
-        print(f"Jane after note: {crm.find_customer('user456')}") # Corrected line
-    print("--- CRM Module Test Complete ---\n")
-
-def test_sre_module(sre, crm_module_instance):
-    print("--- Testing Smart Reply Engine ---")
-    # Clean up old data for consistent testing
-    if os.path.exists(sre.TRIGGERS_FILE): os.remove(sre.TRIGGERS_FILE)
-    if os.path.exists(sre.RESPONSES_FILE): os.remove(sre.RESPONSES_FILE)
-    if os.path.exists(sre.MAPPINGS_FILE): os.remove(sre.MAPPINGS_FILE)
-    sre.triggers = sre._load_data(sre.TRIGGERS_FILE, {})
-    sre.responses = sre._load_data(sre.RESPONSES_FILE, {})
-    sre.mappings = sre._load_data(sre.MAPPINGS_FILE, [])
-
-    print("Adding trigger 'hello'...")
-    sre.add_trigger("hello", "exact", "greeting")
-    trg_hello_id = list(sre.triggers.keys())[0] # Assuming it's the first one
-
-    print("Adding trigger 'τιμή'...")
-    sre.add_trigger("τιμή", "contains", "pricing_query")
-    trg_price_id = list(sre.triggers.keys())[1]
-
-    print("\nAdding response for greeting...")
-    sre.add_response("Hello {user_name}! How can I help?", "text")
-    res_greeting_id = list(sre.responses.keys())[0]
-
-    print("Adding response for pricing...")
-    sre.add_response("For prices, please check {pricelist_url}", "markdown")
-    res_pricing_id = list(sre.responses.keys())[1]
-
-    print("\nMapping 'hello' trigger to greeting response...")
-    sre.add_mapping(trg_hello_id, res_greeting_id)
-    print("Mapping 'τιμή' trigger to pricing response...")
-    sre.add_mapping(trg_price_id, res_pricing_id)
-
-    print("\nProcessing message 'hello' for user123 (John Doe)...")
-    john_crm_data = crm_module_instance.find_customer("user123")
-    response1 = sre.process_message("hello", user_telegram_id="user123", crm_data=john_crm_data)
-    print(f"Response: {response1}")
-
-    print("\nProcessing message 'ποια είναι η τιμή;' for user456 (Jane Smith)...")
-    jane_crm_data = crm_module_instance.find_customer("user456")
-    response2 = sre.process_message("ποια είναι η τιμή;", user_telegram_id="user456", crm_data=jane_crm_data)
-    print(f"Response: {response2}")
-
-    print("\nProcessing message 'unknown query'...")
-    response3 = sre.process_message("this is an unknown query")
-    print(f"Response: {response3}") 
-    # Expecting None or a default fallback if implemented in SRE, currently SRE returns None if no match
-
-    print("--- Smart Reply Engine Test Complete ---")
-
-if __name__ == "__main__":
-    # Initialize CRM module first as SRE might depend on it
-    crm_instance = CRMModule()
-    test_crm_module(crm_instance)
-
-    # Initialize SRE with the CRM instance
-    sre_instance = SmartReplyEngine(crm_module=crm_instance)
-    test_sre_module(sre_instance, crm_instance)
-
-    print("\nAll module tests concluded.")
-    print(f"CRM data is in: {crm_instance.CRM_DATA_FILE}")
-    print(f"SRE trigger data is in: {sre_instance.TRIGGERS_FILE}")
-    print(f"SRE response data is in: {sre_instance.RESPONSES_FILE}")
-    print(f"SRE mapping data is in: {sre_instance.MAPPINGS_FILE}")
 
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    """Point the CRM and smart reply data files at a temporary directory."""
+    # Every xdist worker gets its own base temp dir, so workers never share these files
+    path = tmp_path_factory.mktemp("data")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(crm_module, "DATA_DIR", str(path))
+        mp.setattr(crm_module, "CRM_DATA_FILE", str(path / "customers.json"))
+        mp.setattr(smart_reply_engine, "DATA_DIR", str(path))
+        mp.setattr(smart_reply_engine, "TRIGGERS_FILE", str(path / "triggers.json"))
+        mp.setattr(smart_reply_engine, "RESPONSES_FILE", str(path / "responses.json"))
+        mp.setattr(smart_reply_engine, "MAPPINGS_FILE", str(path / "mappings.json"))
+        yield path
+
+
+@pytest.fixture(scope="session")
+def crm_instance(data_dir):
+    """CRM module with two customers, built once and only read by the tests."""
+    crm = CRMModule()
+    results = [
+        crm.add_customer("John Doe", "john.doe@example.com", "user123", "Lead", ["BidPrice"], "Initial contact."),
+        crm.add_customer("Jane Smith", "jane.smith@example.com", "user456", "Active Client", ["Amesis"], "Important client."),
+        crm.update_customer_status("user456", "On Hold"),
+        crm.add_note_to_customer("user456", "Follow up next week."),
+    ]
+    for success, msg in results:
+        assert success, msg
+    return crm
+
+
+@pytest.fixture(scope="session")
+def sre_instance(crm_instance):
+    """Smart reply engine with a greeting and a pricing reply, built once."""
+    sre = SmartReplyEngine(crm_module=crm_instance)
+    with sre.bulk():
+        results = [
+            sre.add_trigger("hello", "exact", "greeting"),
+            sre.add_trigger("τιμή", "contains", "pricing_query"),
+            sre.add_response("Hello {crm_name}! How can I help?", "text"),
+            sre.add_response("For prices, please check {pricelist_url}", "markdown"),
+        ]
+        trg_hello_id, trg_price_id = sre.triggers
+        res_greeting_id, res_pricing_id = sre.responses
+        results.append(sre.add_mapping(trg_hello_id, res_greeting_id))
+        results.append(sre.add_mapping(trg_price_id, res_pricing_id))
+    for success, msg in results:
+        assert success, msg
+    return sre
+
+
+@pytest.fixture
+def empty_sre(data_dir, tmp_path, monkeypatch):
+    """Smart reply engine with its own empty data files, for tests that change it."""
+    monkeypatch.setattr(smart_reply_engine, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(smart_reply_engine, "TRIGGERS_FILE", str(tmp_path / "triggers.json"))
+    monkeypatch.setattr(smart_reply_engine, "RESPONSES_FILE", str(tmp_path / "responses.json"))
+    monkeypatch.setattr(smart_reply_engine, "MAPPINGS_FILE", str(tmp_path / "mappings.json"))
+    return SmartReplyEngine()
+
+
+def test_add_duplicate_customer(crm_instance):
+    """Test that a Telegram ID can only be registered once."""
+    success, msg = crm_instance.add_customer("John Again", "john@example.com", "user123", "Lead")
+    assert not success
+    assert crm_instance.find_customer("user123")["name"] == "John Doe"
+
+
+@pytest.mark.parametrize("identifier, search_by, name", [
+    ("user123", "telegram_id", "John Doe"),
+    ("jane.smith@example.com", "email", "Jane Smith"),
+])
+def test_find_customer(crm_instance, identifier, search_by, name):
+    """Test finding a single customer by Telegram ID or email."""
+    assert crm_instance.find_customer(identifier, search_by=search_by)["name"] == name
+
+
+def test_find_customer_by_name(crm_instance):
+    """Test finding customers by part of their name."""
+    assert [c["telegram_id"] for c in crm_instance.find_customer("John", search_by="name")] == ["user123"]
+    assert crm_instance.find_customer("Nobody", search_by="name") is None
+
+
+def test_update_customer(crm_instance):
+    """Test the status change and note added during setup."""
+    jane = crm_instance.find_customer("user456")
+    assert jane["status"] == "On Hold"
+    assert jane["notes"].startswith("Important client.\n")
+    assert jane["notes"].endswith("] Follow up next week.")
+
+
+def test_customers_saved(crm_instance):
+    """Test that customers are written to the data file."""
+    assert CRMModule().customers == crm_instance.customers
+
+
+@pytest.mark.parametrize("message, telegram_id, expected", [
+    ("hello", "user123", {"text": "Hello John Doe! How can I help?", "response_type": "text", "attachments": []}),
+    ("ποια είναι η τιμή;", "user456",
+     {"text": "For prices, please check {pricelist_url}", "response_type": "markdown", "attachments": []}),
+    ("this is an unknown query", None, None),
+])
+def test_process_message(sre_instance, message, telegram_id, expected):
+    """Test replies to matching and unmatched messages."""
+    assert sre_instance.process_message(message, user_telegram_id=telegram_id) == expected
+
+
+def test_smart_reply_data_saved(sre_instance):
+    """Test that the bulk setup wrote every data file."""
+    for file_path in (smart_reply_engine.TRIGGERS_FILE, smart_reply_engine.RESPONSES_FILE,
+                      smart_reply_engine.MAPPINGS_FILE):
+        assert os.path.exists(file_path)
+    reloaded = SmartReplyEngine()
+    assert reloaded.triggers.keys() == sre_instance.triggers.keys()
+    assert len(reloaded.mappings) == 2
+
+
+def test_ids_unique_after_delete(empty_sre):
+    """Test that IDs are not reused after a record is deleted, also across reloads."""
+    for phrase in ("one", "two"):
+        empty_sre.add_trigger(phrase, "exact")
+    
+    # Delete the first trigger and add another one
+    del empty_sre.triggers["TRG_001"]
+    empty_sre.add_trigger("three", "exact")
+    assert sorted(empty_sre.triggers) == ["TRG_002", "TRG_003"]
+    
+    # A reloaded engine continues after the highest saved ID
+    reloaded = SmartReplyEngine()
+    reloaded.add_trigger("four", "exact")
+    assert sorted(reloaded.triggers) == ["TRG_002", "TRG_003", "TRG_004"]
+
+
+@pytest.mark.parametrize("pattern, message, group", [
+    (r"[Pp]rice of (\w+)", "What is the PRICE of gold?", "gold"),
+    (r"[0-9]+ (items?)", "I want 3 items", "items"),
+])
+def test_regex_prefilter_character_class(empty_sre, pattern, message, group):
+    """Test that the required-literal prefilter keeps character-class patterns matching."""
+    with empty_sre.bulk():
+        empty_sre.add_trigger(pattern, "regex")
+        empty_sre.add_response("Got {regex_group_1}")
+        empty_sre.add_mapping("TRG_001", "RES_001")
+    assert empty_sre.process_message(message)["text"] == f"Got {group}"
+
+
+def test_regex_timeout_disables_trigger(empty_sre, monkeypatch, capsys):
+    """Test that a regex trigger that times out is disabled and reported."""
+    pytest.importorskip("regex")
+    monkeypatch.setattr(smart_reply_engine, "REGEX_TIMEOUT", 0.01)
+    
+    # A pattern that backtracks catastrophically on a long non-matching message
+    empty_sre.add_trigger("(a|aa)+$", "regex")
+    assert empty_sre.process_message("a" * 60 + "!") is None
+    
+    # Check that the trigger was disabled and the timeout logged
+    assert empty_sre._compiled["TRG_001"] is None
+    assert "TRG_001 timed out and was disabled" in capsys.readouterr().out
+
+
+@pytest.mark.benchmark(group="perf")
+def test_process_message_perf(benchmark, sre_instance):
+    """Benchmark replying to a matching, a contains-matching and an unmatched message."""
+    messages = ["hello", "ποια είναι η τιμή;", "this is an unknown query"]
+    benchmark(lambda: [sre_instance.process_message(message) for message in messages])